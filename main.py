@@ -1,9 +1,9 @@
 from src.agent_new2 import AIAgent
-from src.config import Config
+from src.config import get_config
 
 def main():
     # Load config and initialize agent
-    config = Config()
+    config = get_config()
     agent = AIAgent(config=config)
 
     # Example documents for ingestion
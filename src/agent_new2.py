@@ -1,24 +1,38 @@
 from typing import List, Dict, Any
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.runnables import RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
 from langchain_ollama import ChatOllama
 from src.rag import RAGSystem
 from src.memory import AgentMemory
-from src.config import Config
+from src.config import Config, get_config
+from src.cache import CacheManager, get_llm_cache_key
 from src.knowledge import KnowledgeSynthesizer
+import asyncio
 import logging
 import os
 
 logger = logging.getLogger(__name__)
 
+LLM_TEMPERATURE = 0.7
+# A fixed sampling seed makes a given prompt produce the same answer every
+# time, which is what lets sampled (temperature > 0) answers be cached
+LLM_SEED = 42
+SYSTEM_PROMPT = "You are a helpful AI assistant. Respond in a clear and concise manner."
+
 class AIAgent:
     def __init__(self, config: Config = None):
         """Initialize the AI agent with modular components."""
         try:
-            self.config = config or Config()
+            self.config = config or get_config()
             self.memory = AgentMemory()
-            self.rag = RAGSystem()
+            # One summary at a time when overlapping queries find the window full
+            self._summary_lock = asyncio.Lock()
+            self.cache = CacheManager(self.config)
+            self.rag = RAGSystem(cache=self.cache)
+            # Kept across reports so its scanner can reuse an unchanged summary
+            self._synthesizer = None
             
             # Initialize with default documents for RAG system
             default_docs = [
@@ -34,7 +48,8 @@ class AIAgent:
                 self.llm = ChatOllama(
                     base_url=self.config.ollama_host,
                     model=self.config.ollama_model,
-                    temperature=0.7
+                    temperature=LLM_TEMPERATURE,
+                    seed=LLM_SEED
                 )
                 logger.info(f"Successfully initialized Ollama LLM: {self.config.ollama_model}")
             except Exception as e:
@@ -43,10 +58,11 @@ class AIAgent:
 
             # Initialize the prompt template
             self.prompt = ChatPromptTemplate.from_messages([
-                ("system", "You are a helpful AI assistant. Respond in a clear and concise manner."),
+                ("system", SYSTEM_PROMPT),
                 MessagesPlaceholder(variable_name="chat_history"),
                 ("human", "{question}")
             ])
+            self._system_msg = SystemMessage(content=SYSTEM_PROMPT)
 
             # Initialize the conversation chain
             self.conversation = None
@@ -76,7 +92,11 @@ class AIAgent:
             raise
 
     def query(self, question: str) -> Dict[str, Any]:
-        """Query the agent with a question."""
+        """Query the agent with a question (blocking wrapper for CLI use)."""
+        return asyncio.run(self.aquery(question))
+
+    async def aquery(self, question: str) -> Dict[str, Any]:
+        """Query the agent, retrieving source documents while the LLM generates."""
         if not self.llm:
             return {
                 "answer": "I apologize, but I am currently running in limited mode without an LLM backend. Please ensure Ollama is installed and running.",
@@ -84,31 +104,25 @@ class AIAgent:
             }
         
         try:
-            # Add the user's question to memory
-            self.memory.add_message(question, is_human=True)
-            
-            # Build prompt messages and invoke LLM directly for robustness with mocks
-            messages = self.prompt.format_messages(
-                chat_history=self.memory.get_messages(),
-                question=question
+            if self.memory.is_full():
+                async with self._summary_lock:
+                    # Another request may have summarized while this one waited
+                    if self.memory.is_full():
+                        await self._asummarize_history()
+
+            # Generate from a snapshot of the history and store the question with
+            # its answer afterwards, so overlapping requests can't interleave turns
+            messages = self._build_messages(question)
+
+            # Sources are returned alongside the answer, not fed into the
+            # prompt, so retrieval and generation are independent
+            response_text, source_documents = await asyncio.gather(
+                self._agenerate(messages),
+                self._aretrieve(question)
             )
-            raw_response = self.llm.invoke(messages)
-            if hasattr(raw_response, "content"):
-                response_text = raw_response.content
-            else:
-                response_text = str(raw_response)
-            
-            # Add the response to memory
-            self.memory.add_message(response_text, is_human=False)
-            
-            # Get relevant documents from RAG system
-            try:
-                retriever = self.rag.get_retriever()
-                source_documents = retriever.get_relevant_documents(question)
-            except Exception as e:
-                logger.warning(f"Error retrieving documents: {str(e)}")
-                source_documents = []
-            
+
+            self.memory.add_exchange(question, response_text)
+
             return {
                 "answer": response_text,
                 "source_documents": source_documents
@@ -121,6 +135,56 @@ class AIAgent:
                 "source_documents": []
             }
 
+    def _build_messages(self, question: str) -> List[BaseMessage]:
+        """Same messages as self.prompt.format_messages, without template rendering."""
+        return [self._system_msg, *self.memory.get_messages(), HumanMessage(content=question)]
+
+    async def _agenerate(self, messages: List[BaseMessage]) -> str:
+        """Generate an answer, serving identical prompts from the cache."""
+        # Identical prompt + history skips the LLM entirely. With the fixed
+        # seed the cached answer is the one the model would generate again
+        cache_key = get_llm_cache_key(
+            self.config.ollama_model,
+            LLM_TEMPERATURE,
+            LLM_SEED,
+            [(m.type, m.content) for m in messages]
+        )
+        # CacheManager is synchronous (blocking Redis round trips, plus waits on
+        # its connection pool), so it runs in a worker thread, off the event loop
+        response_text = await asyncio.to_thread(self.cache.get, cache_key)
+        if response_text is None:
+            raw_response = await self.llm.ainvoke(messages)
+            if hasattr(raw_response, "content"):
+                response_text = raw_response.content
+            else:
+                response_text = str(raw_response)
+            await asyncio.to_thread(self.cache.set, cache_key, response_text)
+        return response_text
+
+    async def _asummarize_history(self) -> None:
+        """Fold the older half of a full memory window into a summary."""
+        try:
+            await asyncio.to_thread(self.memory.summarize_older, self._summarize_messages)
+        except Exception as e:
+            logger.warning(f"Error summarizing conversation history: {str(e)}")
+
+    def _summarize_messages(self, messages: List[BaseMessage]) -> str:
+        transcript = "\n".join(f"{m.type}: {m.content}" for m in messages)
+        raw_response = self.llm.invoke([
+            SystemMessage(content="Summarize this conversation concisely, keeping the facts needed to continue it."),
+            HumanMessage(content=transcript)
+        ])
+        return raw_response.content if hasattr(raw_response, "content") else str(raw_response)
+
+    async def _aretrieve(self, question: str) -> List[Any]:
+        """Get relevant documents from the RAG system; empty on failure."""
+        try:
+            retriever = self.rag.get_retriever()
+            return await retriever.aget_relevant_documents(question)
+        except Exception as e:
+            logger.warning(f"Error retrieving documents: {str(e)}")
+            return []
+
     def clear_memory(self) -> None:
         """Clear the conversation memory."""
         try:
@@ -133,9 +197,10 @@ class AIAgent:
     def generate_security_report(self) -> Dict[str, Any]:
         """Generate a knowledge and security report for the project."""
         try:
-            root_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            synthesizer = KnowledgeSynthesizer(root_path)
-            return synthesizer.generate_report()
+            if self._synthesizer is None:
+                root_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+                self._synthesizer = KnowledgeSynthesizer(root_path)
+            return self._synthesizer.generate_report()
         except Exception as e:
             logger.error(f"Error generating security report: {str(e)}")
             raise
\ No newline at end of file
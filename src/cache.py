@@ -1,21 +1,89 @@
-import json
+import hashlib
+import orjson
 import redis
+import redis.asyncio
 import logging
-from typing import Any, Optional
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from cachetools import TLRUCache
 from src.config import Config
 
 logger = logging.getLogger(__name__)
 
+# Shows up in CLIENT LIST so cache connections are easy to tell apart.
+# The C hiredis reply parser (redis[hiredis]) is picked up automatically
+REDIS_CLIENT_NAME = "synrax-cache"
+
+_MISS = object()
+
+# orjson returns bytes that go to Redis as-is; NON_STR_KEYS keeps parity
+# with json.dumps for dicts keyed by ints
+_ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+class _LocalCache:
+    """In-process L1 cache placed in front of Redis for hot keys.
+
+    Every worker process holds its own copy, so entries are short-lived
+    (CACHE_L1_TTL) and never outlive the Redis key they mirror. Entries are
+    the serialized bytes stored in Redis, so an L1 hit decodes to the same
+    value as a Redis hit, and callers never share (or mutate) a cached object.
+    """
+
+    def __init__(self, maxsize: int, ttl: int):
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._entries = TLRUCache(maxsize=maxsize, ttu=self._ttu) if maxsize > 0 else None
+
+    def _ttu(self, _key: str, entry: tuple, now: float) -> float:
+        return now + min(entry[0], self.ttl)
+
+    def get(self, key: str) -> Any:
+        """Return the cached value, or _MISS"""
+        if self._entries is None:
+            return _MISS
+        with self._lock:
+            entry = self._entries.get(key)
+        return _MISS if entry is None else entry[1]
+
+    def put(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        if self._entries is None:
+            return
+        with self._lock:
+            self._entries[key] = (ttl if ttl and ttl > 0 else self.ttl, value)
+
+    def pop(self, key: str) -> None:
+        if self._entries is None:
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        if self._entries is None:
+            return
+        with self._lock:
+            self._entries.clear()
+
 class CacheManager:
-    """Redis-based caching manager"""
+    """Redis-based caching manager with an in-process L1 for hot keys"""
 
     def __init__(self, config: Config):
         self.config = config
         self.redis_client = None
+        self._l1 = _LocalCache(self.config.cache_l1_size, self.config.cache_l1_ttl)
 
         if self.config.cache_enabled:
             try:
-                self.redis_client = redis.from_url(self.config.redis_url)
+                # Bounded pool shared by all callers: connections are reused and
+                # callers wait (up to 5s) for a free one instead of opening more
+                pool = redis.BlockingConnectionPool.from_url(
+                    self.config.redis_url,
+                    max_connections=self.config.redis_pool_size,
+                    timeout=5,
+                    socket_keepalive=True,
+                    client_name=REDIS_CLIENT_NAME,
+                    decode_responses=False,
+                )
+                self.redis_client = redis.Redis(connection_pool=pool)
                 # Test connection
                 self.redis_client.ping()
                 logger.info("Redis cache initialized successfully")
@@ -29,9 +97,16 @@ class CacheManager:
             return None
 
         try:
-            value = self.redis_client.get(key)
+            cached = self._l1.get(key)
+            if cached is not _MISS:
+                return orjson.loads(cached)
+
+            # Fetch the remaining TTL in the same round trip so the L1 copy
+            # expires no later than the Redis one
+            value, pttl = self.redis_client.pipeline(transaction=False).get(key).pttl(key).execute()
             if value:
-                return json.loads(value)
+                self._l1.put(key, value, pttl / 1000)
+                return orjson.loads(value)
             return None
         except Exception as e:
             logger.error(f"Cache get error: {str(e)}")
@@ -44,19 +119,54 @@ class CacheManager:
 
         try:
             ttl = ttl or self.config.cache_ttl
-            serialized_value = json.dumps(value)
-            return bool(self.redis_client.setex(key, ttl, serialized_value))
+            serialized_value = orjson.dumps(value, option=_ORJSON_OPTIONS)
+            stored = bool(self.redis_client.setex(key, ttl, serialized_value))
+            if stored:
+                self._l1.put(key, serialized_value, ttl)
+            return stored
         except Exception as e:
             logger.error(f"Cache set error: {str(e)}")
             return False
 
-    def delete(self, key: str) -> bool:
-        """Delete value from cache"""
+    def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        """Get several values in one round trip; missing keys yield None.
+
+        Bulk reads bypass the L1 so large batches don't evict hot keys.
+        """
+        if not self.redis_client or not keys:
+            return [None] * len(keys)
+
+        try:
+            return [orjson.loads(value) if value else None for value in self.redis_client.mget(keys)]
+        except Exception as e:
+            logger.error(f"Cache get_many error: {str(e)}")
+            return [None] * len(keys)
+
+    def set_many(self, items: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+        """Set several values in one pipelined round trip"""
+        if not self.redis_client or not items:
+            return False
+
+        try:
+            ttl = ttl or self.config.cache_ttl
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key, value in items.items():
+                self._l1.pop(key)
+                pipe.setex(key, ttl, orjson.dumps(value, option=_ORJSON_OPTIONS))
+            return all(pipe.execute())
+        except Exception as e:
+            logger.error(f"Cache set_many error: {str(e)}")
+            return False
+
+    def delete(self, *keys: str) -> bool:
+        """Delete one or more values from cache in a single round trip"""
         if not self.redis_client:
             return False
 
         try:
-            return bool(self.redis_client.delete(key))
+            for key in keys:
+                self._l1.pop(key)
+            return bool(self.redis_client.delete(*keys))
         except Exception as e:
             logger.error(f"Cache delete error: {str(e)}")
             return False
@@ -67,21 +177,238 @@ class CacheManager:
             return False
 
         try:
+            if self._l1.get(key) is not _MISS:
+                return True
             return bool(self.redis_client.exists(key))
         except Exception as e:
             logger.error(f"Cache exists error: {str(e)}")
             return False
 
-    def clear_pattern(self, pattern: str) -> int:
-        """Clear all keys matching pattern"""
+    def clear_pattern(self, pattern: str, batch_size: int = 500) -> int:
+        """Clear all keys matching pattern without blocking Redis.
+
+        Walks the keyspace with SCAN and frees keys with UNLINK in bounded
+        batches, unlike KEYS which blocks the server for the whole scan.
+        """
         if not self.redis_client:
             return 0
 
         try:
-            keys = self.redis_client.keys(pattern)
-            if keys:
-                return self.redis_client.delete(*keys)
+            # Redis globs are not worth re-implementing for a short-lived L1
+            self._l1.clear()
+            total = 0
+            batch = []
+            for key in self.redis_client.scan_iter(match=pattern, count=batch_size):
+                batch.append(key)
+                if len(batch) >= batch_size:
+                    total += self.redis_client.unlink(*batch)
+                    batch = []
+            if batch:
+                total += self.redis_client.unlink(*batch)
+            return total
+        except Exception as e:
+            logger.error(f"Cache clear pattern error: {str(e)}")
             return 0
+
+class AsyncCacheManager:
+    """Redis-based caching manager for use from the event loop"""
+
+    def __init__(self, config: Config):
+        self.config = config
+        self.redis_client = None
+        self._l1 = _LocalCache(self.config.cache_l1_size, self.config.cache_l1_ttl)
+
+        if self.config.cache_enabled:
+            try:
+                pool = redis.asyncio.BlockingConnectionPool.from_url(
+                    self.config.redis_url,
+                    max_connections=self.config.redis_pool_size,
+                    timeout=5,
+                    socket_keepalive=True,
+                    client_name=REDIS_CLIENT_NAME,
+                    decode_responses=False,
+                )
+                self.redis_client = redis.asyncio.Redis(connection_pool=pool)
+            except Exception as e:
+                logger.warning(f"Redis configuration invalid, caching disabled: {str(e)}")
+                self.redis_client = None
+
+    async def connect(self) -> bool:
+        """Test the connection; caching is disabled if Redis is unreachable"""
+        if not self.redis_client:
+            return False
+
+        try:
+            await self.redis_client.ping()
+            logger.info("Redis async cache initialized successfully")
+            return True
+        except Exception as e:
+            logger.warning(f"Redis connection failed, caching disabled: {str(e)}")
+            self.redis_client = None
+            return False
+
+    async def close(self) -> None:
+        """Release pooled connections"""
+        if self.redis_client:
+            await self.redis_client.aclose()
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Get value from cache"""
+        if not self.redis_client:
+            return None
+
+        try:
+            cached = self._l1.get(key)
+            if cached is not _MISS:
+                return orjson.loads(cached)
+
+            # Fetch the remaining TTL in the same round trip so the L1 copy
+            # expires no later than the Redis one
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                value, pttl = await pipe.get(key).pttl(key).execute()
+            if value:
+                self._l1.put(key, value, pttl / 1000)
+                return orjson.loads(value)
+            return None
+        except Exception as e:
+            logger.error(f"Cache get error: {str(e)}")
+            return None
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        """Set value in cache"""
+        if not self.redis_client:
+            return False
+
+        try:
+            ttl = ttl or self.config.cache_ttl
+            serialized_value = orjson.dumps(value, option=_ORJSON_OPTIONS)
+            stored = bool(await self.redis_client.set(key, serialized_value, ex=ttl))
+            if stored:
+                self._l1.put(key, serialized_value, ttl)
+            return stored
+        except Exception as e:
+            logger.error(f"Cache set error: {str(e)}")
+            return False
+
+    async def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        """Get several values in one round trip; missing keys yield None.
+
+        L1 hits are served locally and only the rest go to Redis. Results
+        are not copied into the L1.
+        """
+        if not self.redis_client or not keys:
+            return [None] * len(keys)
+
+        try:
+            raw = [self._l1.get(key) for key in keys]
+            missing = [i for i, value in enumerate(raw) if value is _MISS]
+            if missing:
+                values = await self.redis_client.mget([keys[i] for i in missing])
+                for i, value in zip(missing, values):
+                    raw[i] = value
+            return [orjson.loads(value) if value else None for value in raw]
+        except Exception as e:
+            logger.error(f"Cache get_many error: {str(e)}")
+            return [None] * len(keys)
+
+    async def set_and_delete(self, key: str, value: Any, ttl: Optional[int] = None, delete_keys: Sequence[str] = ()) -> bool:
+        """Set a value and delete other keys atomically, in one MULTI/EXEC round trip"""
+        if not self.redis_client:
+            return False
+
+        try:
+            ttl = ttl or self.config.cache_ttl
+            serialized_value = orjson.dumps(value, option=_ORJSON_OPTIONS)
+            for stale_key in delete_keys:
+                self._l1.pop(stale_key)
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                pipe.set(key, serialized_value, ex=ttl)
+                if delete_keys:
+                    pipe.delete(*delete_keys)
+                stored = bool((await pipe.execute())[0])
+            if stored:
+                self._l1.put(key, serialized_value, ttl)
+            return stored
+        except Exception as e:
+            logger.error(f"Cache set_and_delete error: {str(e)}")
+            return False
+
+    async def delete(self, *keys: str) -> bool:
+        """Delete one or more values from cache in a single round trip"""
+        if not self.redis_client:
+            return False
+
+        try:
+            for key in keys:
+                self._l1.pop(key)
+            return bool(await self.redis_client.delete(*keys))
+        except Exception as e:
+            logger.error(f"Cache delete error: {str(e)}")
+            return False
+
+    async def incr(self, key: str, ttl: Optional[int] = None) -> Optional[int]:
+        """Atomically increment a counter in Redis; None if unavailable.
+
+        Counters bypass the L1, so every worker sees a bump immediately.
+        """
+        if not self.redis_client:
+            return None
+
+        try:
+            ttl = ttl or self.config.cache_ttl
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                value, _ = await pipe.incr(key).expire(key, ttl).execute()
+            return value
+        except Exception as e:
+            logger.error(f"Cache incr error: {str(e)}")
+            return None
+
+    async def get_counter(self, key: str) -> int:
+        """Read a counter written by incr straight from Redis; 0 if unset or unavailable"""
+        if not self.redis_client:
+            return 0
+
+        try:
+            return int(await self.redis_client.get(key) or 0)
+        except Exception as e:
+            logger.error(f"Cache get_counter error: {str(e)}")
+            return 0
+
+    async def exists(self, key: str) -> bool:
+        """Check if key exists in cache"""
+        if not self.redis_client:
+            return False
+
+        try:
+            if self._l1.get(key) is not _MISS:
+                return True
+            return bool(await self.redis_client.exists(key))
+        except Exception as e:
+            logger.error(f"Cache exists error: {str(e)}")
+            return False
+
+    async def clear_pattern(self, pattern: str, batch_size: int = 500) -> int:
+        """Clear all keys matching pattern without blocking Redis.
+
+        Walks the keyspace with SCAN and frees keys with UNLINK in bounded
+        batches, unlike KEYS which blocks the server for the whole scan.
+        """
+        if not self.redis_client:
+            return 0
+
+        try:
+            # Redis globs are not worth re-implementing for a short-lived L1
+            self._l1.clear()
+            total = 0
+            batch = []
+            async for key in self.redis_client.scan_iter(match=pattern, count=batch_size):
+                batch.append(key)
+                if len(batch) >= batch_size:
+                    total += await self.redis_client.unlink(*batch)
+                    batch = []
+            if batch:
+                total += await self.redis_client.unlink(*batch)
+            return total
         except Exception as e:
             logger.error(f"Cache clear pattern error: {str(e)}")
             return 0
@@ -90,14 +417,38 @@ class CacheManager:
 def get_query_cache_key(question: str, user_id: int) -> str:
     """Generate cache key for query results"""
     # Simple hash of question + user_id to avoid key length issues
-    import hashlib
     key_content = f"{user_id}:{question[:100]}"
-    return f"query:{hashlib.md5(key_content.encode()).hexdigest()}"
+    return f"query:{hashlib.blake2b(key_content.encode(), digest_size=16).hexdigest()}"
+
+def get_llm_cache_key(model: str, temperature: float, seed: int, messages: Sequence[Tuple[str, str]]) -> str:
+    """Generate cache key for an LLM response to an exact (type, content) message list"""
+    payload = orjson.dumps({"m": model, "t": temperature, "s": seed, "msgs": messages}, option=orjson.OPT_SORT_KEYS)
+    return f"llm:{hashlib.blake2b(payload, digest_size=16).hexdigest()}"
+
+def get_embedding_cache_key(model: str, content_hash: str) -> str:
+    """Generate cache key for a chunk embedding"""
+    return f"emb:{model}:{content_hash}"
 
 def get_session_cache_key(session_id: str) -> str:
     """Generate cache key for sessions"""
     return f"session:{session_id}"
 
+def get_conversations_cache_key(user_id: int, version: int) -> str:
+    """Generate cache key for a user's conversation list at a given version"""
+    return f"conv_list:{user_id}:{version}"
+
+def get_conversations_version_key(user_id: int) -> str:
+    """Generate cache key for the version counter of a user's conversation list"""
+    return f"conv_list_version:{user_id}"
+
 def get_report_cache_key() -> str:
     """Generate cache key for security reports"""
-    return "security_report"
\ No newline at end of file
+    return "security_report"
+
+def get_report_status_cache_key() -> str:
+    """Generate cache key for the report-generation-in-progress flag"""
+    return "security_report:generating"
+
+def get_report_error_cache_key() -> str:
+    """Generate cache key for the most recent report-generation failure"""
+    return "security_report:last_error"
\ No newline at end of file
@@ -1,5 +1,6 @@
 import os
 import secrets
+import functools
 from typing import Optional
 from urllib.parse import urlparse
 from dotenv import load_dotenv
@@ -50,6 +51,10 @@ class Config:
         self.redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379')
         self.cache_enabled = self._parse_bool(os.getenv('CACHE_ENABLED', 'true'))
         self.cache_ttl = int(os.getenv('CACHE_TTL', '3600'))  # 1 hour default
+        self.redis_pool_size = int(os.getenv('REDIS_POOL_SIZE', '32'))
+        # In-process L1 in front of Redis (set CACHE_L1_SIZE=0 to disable)
+        self.cache_l1_size = int(os.getenv('CACHE_L1_SIZE', '1024'))
+        self.cache_l1_ttl = int(os.getenv('CACHE_L1_TTL', '60'))
 
         # Security settings
         self.security = SecurityConfig()
@@ -66,6 +71,9 @@ class Config:
         self.log_level = os.getenv('LOG_LEVEL', 'INFO')
         self.log_file = os.getenv('LOG_FILE', 'security.log')
 
+        # Interactive API docs at /docs (off unless explicitly enabled)
+        self.enable_docs = self._parse_bool(os.getenv('ENABLE_DOCS', 'false'))
+
         # Session configuration
         self.session_lifetime = int(os.getenv('SESSION_LIFETIME',
                                             str(SecurityConfig.SESSION_LIFETIME)))
@@ -80,6 +88,14 @@ class Config:
         # Allow disabling public registration to make the app single-user
         self.allow_user_registration = self._parse_bool(os.getenv('ALLOW_USER_REGISTRATION', 'true'))
 
+        # Static bearer token for Prometheus scrapes of /metrics (optional)
+        self.metrics_token = os.getenv('METRICS_TOKEN') or None
+
+        # Headers depend only on the settings above; build both variants once
+        self._security_headers = {
+            debug: self._build_security_headers(debug) for debug in (False, True)
+        }
+
     def _validate_and_set_ollama_config(self):
         """Validate and set Ollama configuration with security checks"""
         self.ollama_host = os.getenv('OLLAMA_HOST', 'http://localhost:11434')
@@ -111,6 +127,10 @@ class Config:
         return [origin.strip() for origin in origins.split(',') if origin.strip()]
 
     def get_security_headers(self, debug: bool = False) -> dict:
+        """Security headers for HTTP responses (shared dict; do not mutate)"""
+        return self._security_headers[bool(debug)]
+
+    def _build_security_headers(self, debug: bool) -> dict:
         """Generate security headers for HTTP responses"""
         return {
             'X-Content-Type-Options': 'nosniff',
@@ -138,3 +158,8 @@ class Config:
     def is_allowed_host(self, host: str) -> bool:
         """Check if a host is allowed"""
         return host in self.security.ALLOWED_HOSTS
+
+@functools.lru_cache(maxsize=1)
+def get_config() -> Config:
+    """Process-wide Config, parsed from the environment once"""
+    return Config()
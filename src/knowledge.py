@@ -6,6 +6,16 @@ class KnowledgeSynthesizer:
     """
     Synthesizes project knowledge and security report based on scanned files and detected framework.
     """
+    _RECOMMENDATIONS = {
+        'Django': "Verifica CSRF, usa settings.SECURE_*, aggiorna dipendenze, configura CORS.",
+        'FastAPI': "Usa HTTPS, rate limiting, valida input, configura CORS, aggiungi security headers.",
+        'Flask': "Abilita session cookie sicuri, usa Flask-SeaSurf, aggiorna dipendenze, configura CORS.",
+        'Node.js': "Usa helmet, rate limiting, valida input, aggiorna dipendenze, configura CORS.",
+        'React': "Sanitizza input, usa CSP, aggiorna dipendenze, limita accesso API.",
+        'Next.js': "Configura CSP, limita accesso API, aggiorna dipendenze, usa HTTPS.",
+    }
+    _DEFAULT_RECOMMENDATION = "Applica best practice di sicurezza generali: valida input, aggiorna dipendenze, usa HTTPS, configura CORS e security headers."
+
     def __init__(self, root_path: str):
         self.scanner = ProjectScanner(root_path)
         self.report: Dict[str, Any] = {}
@@ -35,17 +45,4 @@ class KnowledgeSynthesizer:
         return self.report
 
     def _get_recommendations(self, framework: str) -> str:
-        if framework == 'Django':
-            return "Verifica CSRF, usa settings.SECURE_*, aggiorna dipendenze, configura CORS."
-        elif framework == 'FastAPI':
-            return "Usa HTTPS, rate limiting, valida input, configura CORS, aggiungi security headers."
-        elif framework == 'Flask':
-            return "Abilita session cookie sicuri, usa Flask-SeaSurf, aggiorna dipendenze, configura CORS."
-        elif framework == 'Node.js':
-            return "Usa helmet, rate limiting, valida input, aggiorna dipendenze, configura CORS."
-        elif framework == 'React':
-            return "Sanitizza input, usa CSP, aggiorna dipendenze, limita accesso API."
-        elif framework == 'Next.js':
-            return "Configura CSP, limita accesso API, aggiorna dipendenze, usa HTTPS."
-        else:
-            return "Applica best practice di sicurezza generali: valida input, aggiorna dipendenze, usa HTTPS, configura CORS e security headers."
+        return self._RECOMMENDATIONS.get(framework, self._DEFAULT_RECOMMENDATION)
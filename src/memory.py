@@ -1,33 +1,73 @@
-from typing import List, Dict, Any
+import threading
+from collections import deque
+from itertools import islice
+from typing import Callable, Deque, List, Dict, Any
 from langchain.memory import ConversationBufferMemory
-from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage
 
 class AgentMemory(ConversationBufferMemory):
-    def __init__(self):
+    def __init__(self, max_messages: int = 64):
         super().__init__(
             return_messages=True,
             output_key="answer",
             input_key="question",
             memory_key="chat_history"
         )
-        self._messages: List[BaseMessage] = []
+        # Rolling window: the oldest messages fall off once full, keeping the
+        # prompt size bounded for long chats
+        self._messages: Deque[BaseMessage] = deque(maxlen=max_messages)
+        # summarize_older runs in a worker thread while the event loop may append
+        self._lock = threading.Lock()
 
     def add_message(self, message: str, is_human: bool = True) -> None:
         """Add a message to the memory."""
         msg = HumanMessage(content=message) if is_human else AIMessage(content=message)
-        self._messages.append(msg)
+        with self._lock:
+            self._messages.append(msg)
+
+    def add_exchange(self, question: str, answer: str) -> None:
+        """Add a question and its answer as adjacent messages."""
+        with self._lock:
+            self._messages.append(HumanMessage(content=question))
+            self._messages.append(AIMessage(content=answer))
 
     def get_messages(self) -> List[BaseMessage]:
         """Get all messages in memory."""
-        return self._messages
+        with self._lock:
+            return list(self._messages)
+
+    def is_full(self) -> bool:
+        """Whether the next message will evict the oldest one."""
+        return len(self._messages) == self._messages.maxlen
+
+    def summarize_older(self, summarizer: Callable[[List[BaseMessage]], str]) -> None:
+        """Replace the older half of the window with a single summary message.
+
+        Call before adding to a full window so evicted turns survive in
+        condensed form instead of being dropped. The window is only changed
+        once the summarizer succeeds; if it raises, nothing is removed.
+        """
+        with self._lock:
+            older = list(islice(self._messages, len(self._messages) // 2))
+        if not older:
+            return
+        summary = summarizer(older)
+
+        summarized = {id(msg) for msg in older}
+        with self._lock:
+            # Appends made meanwhile may already have evicted some of them
+            while self._messages and id(self._messages[0]) in summarized:
+                self._messages.popleft()
+            self._messages.appendleft(SystemMessage(content=f"Summary of the earlier conversation: {summary}"))
 
     def clear(self) -> None:
         """Clear all messages from memory."""
-        self._messages = []
+        with self._lock:
+            self._messages.clear()
         super().clear()
 
     def load_memory_variables(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
         """Load the memory variables."""
         return {
-            "chat_history": self._messages
+            "chat_history": self.get_messages()
         }
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, create_engine
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, Index, create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import declarative_base, sessionmaker, relationship
 from datetime import datetime
 from typing import Optional
@@ -39,6 +40,9 @@ class Conversation(Base):
     user = relationship("User", back_populates="conversations")
     messages = relationship("Message", back_populates="conversation", cascade="all, delete-orphan")
 
+    # A user's conversations listed by recency
+    __table_args__ = (Index("ix_conversations_user_updated", "user_id", "updated_at"),)
+
 class Message(Base):
     __tablename__ = "messages"
 
@@ -51,21 +55,53 @@ class Message(Base):
     # Relationships
     conversation = relationship("Conversation", back_populates="messages")
 
+    # A conversation's timeline in order
+    __table_args__ = (Index("ix_messages_conv_created", "conversation_id", "created_at"),)
+
 # Database connection
 def get_database_url():
     """Get database URL from environment or use SQLite for development"""
     return os.getenv("DATABASE_URL", "sqlite:///./ai_agent.db")
 
+def _engine_options(url: str) -> dict:
+    """Pool and driver options sized for concurrent FastAPI workers"""
+    options = {"pool_pre_ping": True}
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        # Wait on the database lock instead of failing fast under concurrent writes
+        options["connect_args"] = {"check_same_thread": False, "timeout": 30}
+        if parsed.database in (None, "", ":memory:"):
+            # In-memory databases use a single-connection pool
+            return options
+    options.update(
+        pool_size=int(os.getenv("DB_POOL_SIZE", "20")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "40")),
+        pool_timeout=10,
+        pool_recycle=1800,
+    )
+    return options
+
 # Initialize a single Engine and SessionLocal per process (FastAPI best practice)
 _DATABASE_URL = get_database_url()
-_ENGINE = create_engine(
-    _DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in _DATABASE_URL else {},
-)
+_ENGINE = create_engine(_DATABASE_URL, **_engine_options(_DATABASE_URL))
+
+if _ENGINE.dialect.name == "sqlite" and _ENGINE.url.database not in (None, "", ":memory:"):
+    @event.listens_for(_ENGINE, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, _connection_record):
+        # WAL lets readers proceed during writes; NORMAL sync is safe under WAL
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=_ENGINE)
 
 # Create tables at import time (idempotent); in migrations setups, replace with Alembic
 Base.metadata.create_all(bind=_ENGINE)
+# create_all skips existing tables, so add indexes introduced since they were created
+for _table in Base.metadata.sorted_tables:
+    for _index in _table.indexes:
+        _index.create(bind=_ENGINE, checkfirst=True)
 
 def create_engine_and_session():
     """Backwards-compatible helper returning the global engine and session factory."""
@@ -3,38 +3,133 @@ from langchain_core.documents import Document
 from langchain_community.vectorstores.chroma import Chroma
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
+from src.cache import CacheManager, get_embedding_cache_key
+import hashlib
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
+# Chunks embedded and written to Chroma per call; keeps memory and HNSW
+# insert cost bounded for large ingests
+INSERT_BATCH = 1000
+
+PERSIST_DIRECTORY = "./.cache/chroma"
+
+# HNSW settings applied when the collection is first created (Chroma keeps
+# an existing collection's settings). Embeddings are normalized, so cosine
+# ranks like L2; a lower search_ef trades a little recall for query latency.
+COLLECTION_METADATA = {
+    "hnsw:space": "cosine",
+    "hnsw:M": 16,
+    "hnsw:construction_ef": 100,
+    "hnsw:search_ef": 64,
+}
+
+# Chunk embeddings are a pure function of (model, text), so keep them long
+EMBEDDING_CACHE_TTL = 7 * 24 * 3600
+
 class RAGSystem:
-    def __init__(self, embedding_model: str = "all-MiniLM-L6-v2"):
+    def __init__(self, embedding_model: str = "all-MiniLM-L6-v2", cache: Optional[CacheManager] = None):
         """Initialize the RAG system with the specified embedding model.
 
-        Heavy components are lazy-loaded to speed up application startup.
+        Heavy components are lazy-loaded to speed up application startup,
+        except when a persisted index exists: then it is opened and warmed
+        up right away so the first query doesn't pay for it. When a cache is
+        given, chunk embeddings are reused across ingests keyed by the
+        SHA-256 of the chunk text.
         """
         self.embedding_model = embedding_model
+        self.cache = cache
         self.embeddings: Optional[HuggingFaceEmbeddings] = None
         self.vectorstore: Optional[Chroma] = None
+        self.chunk_size = 2000
         self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=2000,
+            chunk_size=self.chunk_size,
             chunk_overlap=400,
             separators=["\n\n", "\n", " ", ""],
             length_function=len,
         )
+        if os.path.isdir(PERSIST_DIRECTORY):
+            self.warmup()
 
     def _ensure_embeddings(self) -> None:
         if self.embeddings is None:
             try:
-                logger.info("Initializing HuggingFace embeddings (lazy-load)...")
+                import torch
+
+                if torch.cuda.is_available():
+                    # fp16 weights halve memory traffic and run on tensor cores;
+                    # TF32 covers any matmuls still done in fp32
+                    torch.backends.cuda.matmul.allow_tf32 = True
+                    device, batch_size = "cuda", 128
+                    model_kwargs = {"device": device, "model_kwargs": {"torch_dtype": torch.float16}}
+                else:
+                    device, batch_size = "cpu", 64
+                    model_kwargs = {"device": device}
+                logger.info(f"Initializing HuggingFace embeddings on {device} (lazy-load)...")
                 self.embeddings = HuggingFaceEmbeddings(
                     model_name=self.embedding_model,
                     cache_folder="./.cache/embeddings",
+                    model_kwargs=model_kwargs,
+                    encode_kwargs={"batch_size": batch_size, "normalize_embeddings": True},
                 )
             except Exception as e:
                 logger.error(f"Error initializing embeddings: {str(e)}", exc_info=True)
                 raise
 
+    def _ensure_vectorstore(self) -> None:
+        if self.vectorstore is None:
+            self.vectorstore = Chroma(
+                embedding_function=self.embeddings,
+                persist_directory=PERSIST_DIRECTORY,
+                collection_metadata=COLLECTION_METADATA,
+            )
+            logger.info("Opened vectorstore")
+
+    def warmup(self) -> None:
+        """Load the embedder and page in the persisted index with a throwaway query."""
+        try:
+            self._ensure_embeddings()
+            self._ensure_vectorstore()
+            self.vectorstore.similarity_search("warmup", k=1)
+            logger.info("Vectorstore warmed up")
+        except Exception as e:
+            logger.warning(f"Vectorstore warmup failed: {str(e)}")
+
+    def _embed_with_cache(self, texts: List[str], digests: List[str]) -> List[List[float]]:
+        """Embed texts, reusing vectors cached under their content hash."""
+        if self.cache is None:
+            return self.embeddings.embed_documents(texts)
+
+        keys = [get_embedding_cache_key(self.embedding_model, d) for d in digests]
+        vectors = self.cache.get_many(keys)
+        misses = [i for i, v in enumerate(vectors) if v is None]
+        if misses:
+            fresh = self.embeddings.embed_documents([texts[i] for i in misses])
+            for i, vector in zip(misses, fresh):
+                vectors[i] = vector
+            self.cache.set_many({keys[i]: vectors[i] for i in misses}, ttl=EMBEDDING_CACHE_TTL)
+        logger.debug(f"Embedding cache: {len(texts) - len(misses)} hits, {len(misses)} misses")
+        return vectors
+
+    def _split(self, documents: List[str]) -> List[Document]:
+        """Split documents into chunks, preserving document order.
+
+        A document that already fits in one chunk comes back from the
+        recursive splitter as a single stripped chunk, so skip the splitter's
+        per-separator passes for it.
+        """
+        chunks: List[Document] = []
+        for doc in documents:
+            if len(doc) <= self.chunk_size:
+                text = doc.strip()
+                if text:
+                    chunks.append(Document(page_content=text))
+            else:
+                chunks.extend(self.text_splitter.split_documents([Document(page_content=doc)]))
+        return chunks
+
     def ingest_documents(self, documents: List[str]) -> None:
         """Process and store documents in the vector store."""
         try:
@@ -43,23 +138,48 @@ class RAGSystem:
                 logger.warning("Empty documents list provided to ingest_documents")
                 return
 
-            texts = [Document(page_content=doc) for doc in documents]
-            chunks = self.text_splitter.split_documents(texts)
+            chunks = self._split(documents)
             logger.info(f"Created {len(chunks)} text chunks from {len(documents)} documents")
-            
-            # If vectorstore exists, add to it, otherwise create new one
+            if not chunks:
+                return
+
+            # Content-addressed ids: identical chunks collapse to one row and
+            # re-ingesting the same content is a no-op
+            unique = {}
+            for c in chunks:
+                unique.setdefault(hashlib.sha256(c.page_content.encode()).hexdigest(), c)
+            ids = list(unique)
+            page_texts = [c.page_content for c in unique.values()]
+            metas = [c.metadata for c in unique.values()]
+
             self._ensure_embeddings()
-            if self.vectorstore:
-                self.vectorstore.add_documents(chunks)
-                logger.info(f"Added {len(chunks)} chunks to existing vectorstore")
-            else:
-                self.vectorstore = Chroma.from_documents(
-                    documents=chunks,
-                    embedding=self.embeddings,
-                    persist_directory="./.cache/chroma"
-                )
-                logger.info("Created new vectorstore and ingested documents")
-            
+            self._ensure_vectorstore()
+
+            # Embed each sub-batch (new chunks, cache misses only) in one
+            # batched forward pass and hand the vectors to Chroma so it does
+            # not re-encode them
+            added = 0
+            for start in range(0, len(ids), INSERT_BATCH):
+                batch_ids = ids[start:start + INSERT_BATCH]
+                existing = set(self.vectorstore.get(ids=batch_ids, include=[])["ids"])
+                keep = [i for i, chunk_id in enumerate(batch_ids, start) if chunk_id not in existing]
+                if keep:
+                    batch_ids = [ids[i] for i in keep]
+                    batch_texts = [page_texts[i] for i in keep]
+                    vectors = self._embed_with_cache(batch_texts, batch_ids)
+                    # Private access on purpose: the wrapper has no public way to
+                    # store precomputed vectors (add_texts always re-embeds), so
+                    # they go straight to the underlying collection
+                    self.vectorstore._collection.upsert(
+                        ids=batch_ids,
+                        documents=batch_texts,
+                        embeddings=vectors,
+                        # Chroma rejects empty metadata dicts; None is accepted
+                        metadatas=[metas[i] or None for i in keep],
+                    )
+                    added += len(keep)
+                logger.info(f"Processed {min(start + INSERT_BATCH, len(ids))}/{len(ids)} unique chunks, {added} new")
+
         except Exception as e:
             logger.error(f"Error ingesting documents: {str(e)}", exc_info=True)
             raise
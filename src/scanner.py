@@ -1,96 +1,290 @@
 import os
 import re
-from typing import List, Dict, Any
+import threading
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+try:
+    # Optional: much faster multi-pattern matching for framework detection
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+# Checked in priority order: a file mentioning several frameworks reports the first listed
+FRAMEWORK_PATTERNS = (
+    ('Django', r"django[=><]"),
+    ('FastAPI', r"fastapi[=><]"),
+    ('Flask', r"flask[=><]"),
+    ('Node.js', r"express|koa|hapi"),
+    ('React', r"react"),
+    ('Next.js', r"next"),
+)
+
+
+# Manifests are where a framework is declared, so detect_framework opens them first
+_MANIFEST_PRIORITY = {'pyproject.toml': 0, 'package.json': 0, 'setup.cfg': 1}
+
+SENSITIVE_KEYS = (
+    'secret', 'password', 'passwd', 'token', 'apikey', 'api_key', 'private_key', 'access_key', 'secret_key',
+    'dsn', 'connection', 'conn', 'uri', 'url', 'endpoint', 'auth', 'bearer', 'jwt', 'key'
+)
+# One C-level search answers "does this key contain any sensitive substring?"
+_SENSITIVE_RE = re.compile("|".join(map(re.escape, SENSITIVE_KEYS)).encode())
+# "key:" / "key =" at the start of any line (\n, \r\n or bare \r endings), found in one
+# pass over the raw file; key names are ASCII, so nothing needs decoding up front
+_KEY_RE = re.compile(rb"(?:^|\r)[ \t\f\v]*([A-Za-z0-9_\-.]+)[ \t\f\v]*[:=]", re.MULTILINE)
+
+# File reads are I/O bound and release the GIL, so they are spread over a thread pool
+_MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Framework names sit near the top of manifests and config keys aren't found in
+# lockfiles or bundles, so files past these sizes are not opened at all
+_FRAMEWORK_MAX_SIZE = 512 * 1024
+_CONFIG_MAX_SIZE = 256 * 1024
+
+# Files are scanned in binary chunks; the carried tail must be longer than any match
+_READ_CHUNK = 64 * 1024
+_CHUNK_CARRY = 32
+
+
+def _compile_frameworks(patterns) -> "re.Pattern[bytes]":
+    # Framework names aren't valid group names, so groups are named by position.
+    # The patterns are ASCII, so matching raw bytes saves decoding each file
+    return re.compile(
+        b"|".join(b"(?P<fw%d>%s)" % (i, pattern.encode()) for i, (_, pattern) in enumerate(patterns)),
+        re.IGNORECASE,
+    )
+
+
+# _FRAMEWORK_RES[n] matches any of the first n patterns; [-1] matches all of them
+_FRAMEWORK_RES = [None] + [_compile_frameworks(FRAMEWORK_PATTERNS[:n]) for n in range(1, len(FRAMEWORK_PATTERNS) + 1)]
+
+
+def _match_framework(content: bytes, limit: int = len(FRAMEWORK_PATTERNS)) -> int:
+    """Return the index of the highest-priority pattern among the first `limit`
+    that occurs in content, or `limit` if none does."""
+    idx = limit
+    # The leftmost hit may be a lower-priority pattern; only the ones ahead of it
+    # need another pass, which is usually none
+    while idx:
+        m = _FRAMEWORK_RES[idx].search(content)
+        if not m:
+            break
+        idx = int(m.lastgroup[2:])
+    return idx
+
+
+if hyperscan is not None:
+    # Hyperscan reports every pattern in one SIMD pass, so the best priority falls out
+    # of a single scan instead of the re path's follow-up searches
+    _HS_DB = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+    _HS_DB.compile(
+        expressions=[pattern.encode() for _, pattern in FRAMEWORK_PATTERNS],
+        ids=list(range(len(FRAMEWORK_PATTERNS))),
+        elements=len(FRAMEWORK_PATTERNS),
+        flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * len(FRAMEWORK_PATTERNS),
+    )
+    # Scratch space can't be shared between concurrent scans; files are read on a pool
+    _hs_local = threading.local()
+
+
+def _hs_match_framework(content: bytes, limit: int = len(FRAMEWORK_PATTERNS)) -> int:
+    """Hyperscan version of _match_framework."""
+    scratch = getattr(_hs_local, 'scratch', None)
+    if scratch is None:
+        scratch = _hs_local.scratch = hyperscan.Scratch(_HS_DB)
+    best = [limit]
+
+    def on_match(idx, start, end, flags, context):
+        if idx < best[0]:
+            best[0] = idx
+        # Returning True stops the scan: nothing outranks the first pattern
+        return best[0] == 0
+
+    try:
+        _HS_DB.scan(content, match_event_handler=on_match, scratch=scratch)
+    except hyperscan.ScanTerminated:
+        pass
+    return best[0]
+
+
+def _detect_file_framework(path: str) -> Optional[str]:
+    """Return the highest-priority framework mentioned in the file, if any."""
+    best = len(FRAMEWORK_PATTERNS)
+    carry = b""
+    with open(path, 'rb') as f:
+        # Once the top-priority pattern is found nothing can outrank it
+        while best:
+            chunk = f.read(_READ_CHUNK)
+            if not chunk:
+                break
+            window = carry + chunk
+            best = _hs_match_framework(window, best) if hyperscan is not None else _match_framework(window, best)
+            carry = window[-_CHUNK_CARRY:]
+    return FRAMEWORK_PATTERNS[best][0] if best < len(FRAMEWORK_PATTERNS) else None
+
+
+def _walk(path: str, exclude_dirs) -> Iterator[os.DirEntry]:
+    """Yield file entries top-down like os.walk, pruning excluded directories."""
+    try:
+        with os.scandir(path) as it:
+            entries = list(it)
+    except OSError:
+        return
+    subdirs = []
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        if is_dir:
+            # Symlinked directories are not followed, same as os.walk's default
+            if entry.name not in exclude_dirs and not entry.is_symlink():
+                subdirs.append(entry.path)
+        else:
+            yield entry
+    for subdir in subdirs:
+        yield from _walk(subdir, exclude_dirs)
+
+
+def _extract_file_keys(path: str) -> List[str]:
+    """Return the sorted sensitive key names defined in a config file."""
+    found_keys = set()
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except Exception:
+        return []
+    # Only collect key names; never include values
+    for m in _KEY_RE.finditer(data):
+        key = m.group(1).lower()
+        # Normalize keys like "environment:" or similar won't be included unless sensitive
+        if _SENSITIVE_RE.search(key):
+            found_keys.add(key.decode('ascii'))
+    return sorted(found_keys)
+
 
 class ProjectScanner:
     """
     Scans the project directory, detects frameworks, and extracts key info for security and knowledge analysis.
     """
+    _EXCLUDE_DIRS = frozenset({'.git', '.hg', '.svn', '__pycache__', 'node_modules', 'venv', '.venv', 'env', '.env', 'logs', 'dist', 'build', '.mypy_cache', '.pytest_cache'})
+    _EXCLUDE_FILES = frozenset({'.env', '.env.local', '.env.prod', '.env.dev', 'id_rsa', 'id_rsa.pub', 'id_ed25519', 'id_ed25519.pub'})
+    _ALLOWED_EXTS = frozenset({'.py', '.js', '.ts', '.json', '.yml', '.yaml', '.toml', '.md', '.ini', '.cfg'})
+    _CONFIG_HINTS = ('config', 'settings', 'pyproject', 'package.json', 'requirements', 'docker', 'compose', 'appsettings', 'application')
+
     def __init__(self, root_path: str):
         self.root_path = root_path
         self.files: List[str] = []
         self.framework: str = "unknown"
         self.summary: Dict[str, Any] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._fingerprint: Optional[tuple] = None
+        # path -> (mtime_ns, size) from the last scan, None if the stat failed
+        self._stats: Dict[str, Optional[Tuple[int, int]]] = {}
 
     def scan_files(self) -> List[str]:
         """Recursively scan project files, excluding sensitive dirs/files."""
         self.files = []
-        exclude_dirs = {'.git', '.hg', '.svn', '__pycache__', 'node_modules', 'venv', '.venv', 'env', '.env', 'logs', 'dist', 'build', '.mypy_cache', '.pytest_cache'}
-        exclude_files = {'.env', '.env.local', '.env.prod', '.env.dev', 'id_rsa', 'id_rsa.pub', 'id_ed25519', 'id_ed25519.pub'}
-        allowed_exts = ('.py', '.js', '.ts', '.json', '.yml', '.yaml', '.toml', '.md', '.ini', '.cfg')
-
-        for dirpath, dirnames, filenames in os.walk(self.root_path):
-            # Prune excluded directories in-place
-            dirnames[:] = [d for d in dirnames if d not in exclude_dirs]
-
-            for f in filenames:
-                if f in exclude_files:
-                    continue
-                if not f.lower().endswith(allowed_exts):
-                    continue
-                full_path = os.path.join(dirpath, f)
-                self.files.append(full_path)
+        self._stats = {}
+        for entry in _walk(self.root_path, self._EXCLUDE_DIRS):
+            if entry.name in self._EXCLUDE_FILES:
+                continue
+            if os.path.splitext(entry.name)[1].lower() not in self._ALLOWED_EXTS:
+                continue
+            self.files.append(entry.path)
+            try:
+                st = entry.stat()
+                self._stats[entry.path] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                self._stats[entry.path] = None
         return self.files
 
+    def _within_size(self, file: str, limit: int) -> bool:
+        # Unknown sizes (files set by hand, failed stat) are left for open() to judge
+        stat = self._stats.get(file)
+        return stat is None or stat[1] <= limit
+
+    @contextmanager
+    def _pool(self) -> Iterator[ThreadPoolExecutor]:
+        """Thread pool for file reads, shared by everything inside an outer _pool() block."""
+        if self._executor is not None:
+            yield self._executor
+            return
+        with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as pool:
+            self._executor = pool
+            try:
+                yield pool
+            finally:
+                self._executor = None
+
     def detect_framework(self) -> str:
         """Detect main framework used in the project."""
-        framework_patterns = {
-            'Django': r"django[=><]",
-            'FastAPI': r"fastapi[=><]",
-            'Flask': r"flask[=><]",
-            'Node.js': r"express|koa|hapi",
-            'React': r"react",
-            'Next.js': r"next",
-        }
-        for file in self.files:
+        ranked = sorted((f for f in self.files if self._within_size(f, _FRAMEWORK_MAX_SIZE)), key=lambda p: _MANIFEST_PRIORITY.get(os.path.basename(p).lower(), 99))
+        # Files are read concurrently but results are taken in ranked order, so the
+        # first file with a hit still wins; once it does the rest are abandoned
+        done = threading.Event()
+
+        def detect(file: str) -> Optional[str]:
+            if done.is_set():
+                return None
             try:
-                with open(file, encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                    for fw, pattern in framework_patterns.items():
-                        if re.search(pattern, content, re.IGNORECASE):
-                            self.framework = fw
-                            return fw
+                return _detect_file_framework(file)
             except Exception:
-                continue
+                return None
+
+        files = iter(ranked)
+        with self._pool() as pool:
+            # Only a window of files is in flight; the first manifest usually hits,
+            # and queueing every file up front costs more than it saves
+            pending = deque(pool.submit(detect, file) for file in islice(files, _MAX_WORKERS * 2))
+            while pending:
+                fw = pending.popleft().result()
+                if fw:
+                    done.set()
+                    for future in pending:
+                        future.cancel()
+                    self.framework = fw
+                    return fw
+                file = next(files, None)
+                if file is not None:
+                    pending.append(pool.submit(detect, file))
         return self.framework
 
     def extract_config(self) -> Dict[str, Any]:
         """Extract non-sensitive config metadata only (no raw content)."""
         config_summary: Dict[str, Any] = {}
-        sensitive_keys = [
-            'secret', 'password', 'passwd', 'token', 'apikey', 'api_key', 'private_key', 'access_key', 'secret_key',
-            'dsn', 'connection', 'conn', 'uri', 'url', 'endpoint', 'auth', 'bearer', 'jwt', 'key'
+        candidates = [
+            file for file in self.files
+            if any(x in file.lower() for x in self._CONFIG_HINTS) and self._within_size(file, _CONFIG_MAX_SIZE)
         ]
-        key_pattern = re.compile(r"^\s*([A-Za-z0-9_\-.]+)\s*[:=]", re.IGNORECASE)
+        if not candidates:
+            return config_summary
 
-        for file in self.files:
-            lower = file.lower()
-            if not any(x in lower for x in ['config', 'settings', 'pyproject', 'package.json', 'requirements', 'docker', 'compose', 'appsettings', 'application']):
-                continue
-            try:
-                with open(file, encoding='utf-8', errors='ignore') as f:
-                    found_keys = set()
-                    for raw in f:
-                        line = raw.strip()
-                        # Only collect key names; never include values
-                        m = key_pattern.match(line)
-                        if m:
-                            key = m.group(1).lower()
-                            # Normalize keys like "environment:" or similar won't be included unless sensitive
-                            if any(sk in key for sk in sensitive_keys):
-                                found_keys.add(key)
-                    if found_keys:
-                        # Store only filename (basename) and the list of sensitive key names
-                        config_summary[os.path.basename(file)] = sorted(found_keys)
-            except Exception:
-                continue
+        # map() yields in submission order, so later files still overwrite
+        # earlier ones that share a basename
+        with self._pool() as pool:
+            for file, found_keys in zip(candidates, pool.map(_extract_file_keys, candidates)):
+                if found_keys:
+                    # Store only filename (basename) and the list of sensitive key names
+                    config_summary[os.path.basename(file)] = found_keys
         return config_summary
 
     def summarize(self) -> Dict[str, Any]:
         """Produce a sanitized summary with no raw file paths or contents."""
         self.scan_files()
-        fw = self.detect_framework()
-        config_meta = self.extract_config()
+        # Stat-ing the files is far cheaper than reading them again; if none was
+        # added, removed or modified since the last run, its summary still holds
+        fingerprint = self._file_fingerprint()
+        if fingerprint == self._fingerprint:
+            return self.summary
+        # One pool serves both passes instead of spinning up a second set of threads
+        with self._pool():
+            fw = self.detect_framework()
+            config_meta = self.extract_config()
         # Only expose minimal, non-identifying metadata
         self.summary = {
             'framework': fw,
@@ -98,4 +292,13 @@ class ProjectScanner:
             'config_files': list(config_meta.keys()),  # basenames only
             'config_sensitive_keys': config_meta,      # filename -> [keys]
         }
+        self._fingerprint = fingerprint
         return self.summary
+
+    def invalidate(self) -> None:
+        """Force the next summarize() to re-read the project."""
+        self._fingerprint = None
+
+    def _file_fingerprint(self) -> tuple:
+        # Uses the stats scan_files just took, so no file is stat-ed twice
+        return tuple(self.files), tuple(self._stats.get(file) for file in self.files)
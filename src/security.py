@@ -1,63 +1,159 @@
 import re
 import time
 import logging
+import atexit
+import queue
+from logging.handlers import QueueHandler, QueueListener
 import functools
 import secrets
-from typing import Optional, Dict, Any, Callable
-from fastapi import Request, Response, HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.datastructures import Headers
+import base64
+from dataclasses import dataclass
+from typing import Optional, Tuple
+from cachetools import TTLCache
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from html import escape
 
-# Configure logging
+# Configure logging. Records are only enqueued on the calling thread (often the
+# event loop, inside the middleware); a single listener thread per process does
+# the file/console I/O. Applications swap its handlers with use_log_handlers
+_log_formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(message)s')
+_log_handlers = [logging.FileHandler('security.log', delay=True), logging.StreamHandler()]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_log_listener = QueueListener(_log_queue, *_log_handlers, respect_handler_level=True)
+_log_listener.start()
+
+
+def use_log_handlers(*handlers: logging.Handler) -> None:
+    """Send the process's queued log records to these handlers instead.
+
+    The listener is replaced rather than a second one started, so there is
+    still exactly one thread draining the queue. Records already queued are
+    flushed to the previous handlers first.
+    """
+    global _log_listener
+    _log_listener.stop()
+    for handler in _log_listener.handlers:
+        handler.close()
+    _log_listener = QueueListener(_log_queue, *handlers, respect_handler_level=True)
+    _log_listener.start()
+
+
+def _stop_log_listener() -> None:
+    _log_listener.stop()
+
+
+# Flush whatever is still queued when the process exits
+atexit.register(_stop_log_listener)
+
+# The listener's handlers apply the real format; the queued message stays bare
+_queue_handler = QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter('%(message)s'))
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(message)s',
-    handlers=[
-        logging.FileHandler('security.log'),
-        logging.StreamHandler()
-    ]
+    handlers=[_queue_handler]
 )
 logger = logging.getLogger(__name__)
 
-class SecurityMiddleware(BaseHTTPMiddleware):
-    """Comprehensive security middleware"""
-    def __init__(self, app, config, debug: bool = False):
-        super().__init__(app)
+class SecurityMiddleware:
+    """Comprehensive security middleware.
+
+    Plain ASGI rather than BaseHTTPMiddleware: requests pass straight through to the
+    app and headers are added as the response starts, with no extra task or body
+    streaming per request.
+    """
+    def __init__(self, app: ASGIApp, config, debug: bool = False):
+        self.app = app
         self.config = config
         self.debug = debug
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        # Fixed for the middleware's lifetime, so encoded once into raw ASGI pairs
+        self._security_headers = tuple(
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in config.get_security_headers(debug).items()
+        )
+        self._security_header_names = frozenset(name for name, _ in self._security_headers)
+        self._allowed_hosts = frozenset(host.encode("latin-1") for host in config.security.ALLOWED_HOSTS)
+        self._max_size_digits = len(str(config.max_request_size))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Replace any the app set itself, as headers.update() used to
+                names = self._security_header_names
+                raw = [header for header in message.get("headers", ()) if header[0] not in names]
+                raw.extend(self._security_headers)
+                message["headers"] = raw
+            await send(message)
+
+        host, content_length = self._find_headers(scope["headers"])
+        rejection = self._check_host(host) or self._check_content_length(content_length)
+        if rejection is not None:
+            await self._reject(*rejection, scope, receive, send_with_headers)
+            return
+
         try:
-            # Host validation
-            host = request.headers.get("host", "").split(":")[0]
-            if not self.config.is_allowed_host(host):
-                logger.warning(f"Invalid host header: {host}")
-                raise HTTPException(status_code=400, detail="Invalid host header")
-
-            # Request size validation
-            content_length = request.headers.get("content-length", 0)
-            if int(content_length) > self.config.max_request_size:
-                logger.warning(f"Request too large: {content_length} bytes")
-                raise HTTPException(status_code=413, detail="Request too large")
-
-            # Process request
-            response = await call_next(request)
-
-            # Add security headers
-            response.headers.update(self.config.get_security_headers(self.debug))
-            
-            return response
-
-        except HTTPException as e:
-            logger.error(f"Security violation: {str(e)}")
-            raise
+            await self.app(scope, receive, send_with_headers)
         except Exception as e:
             logger.error(f"Unexpected error: {str(e)}")
-            raise HTTPException(status_code=500, detail="Internal server error")
+            raise
+
+    @staticmethod
+    def _find_headers(headers) -> Tuple[Optional[bytes], Optional[bytes]]:
+        """Host and Content-Length from raw (bytes, bytes) pairs with lowercased
+        names; the first of each counts"""
+        host = content_length = None
+        for name, value in headers:
+            if name == b"host":
+                if host is None:
+                    host = value
+            elif name == b"content-length":
+                if content_length is None:
+                    content_length = value
+        return host, content_length
+
+    def _check_host(self, host: Optional[bytes]) -> Optional[Tuple[int, str]]:
+        """Host validation, port stripped"""
+        host = host or b""
+        colon = host.find(b":")
+        if colon >= 0:
+            host = host[:colon]
+        if host not in self._allowed_hosts:
+            logger.warning(f"Invalid host header: {host.decode('latin-1')}")
+            return 400, "Invalid host header"
+        return None
+
+    def _check_content_length(self, content_length: Optional[bytes]) -> Optional[Tuple[int, str]]:
+        """Request size validation; bytes.isdigit() is ASCII-only, so anything it
+        accepts is a well-formed length. Over-long values are too large without
+        going through int(), which also refuses strings past 4300 digits"""
+        if content_length is None:
+            return None
+        if not content_length.isdigit():
+            logger.warning(f"Malformed content-length: {content_length.decode('latin-1')}")
+            return 400, "Invalid content-length header"
+        digits = content_length.lstrip(b"0")
+        if len(digits) > self._max_size_digits or int(digits or b"0") > self.config.max_request_size:
+            logger.warning(f"Request too large: {content_length.decode('latin-1')} bytes")
+            return 413, "Request too large"
+        return None
+
+    @staticmethod
+    async def _reject(status_code: int, detail: str, scope: Scope, receive: Receive, send: Send) -> None:
+        logger.error(f"Security violation: {status_code}: {detail}")
+        response = JSONResponse({"detail": detail}, status_code=status_code)
+        await response(scope, receive, send)
 
     # Rate limiting is handled by slowapi in the app; no client-id helper needed here.
 
+
+_SCRIPT_RE = re.compile(r"<\s*script", re.IGNORECASE)
+
 class InputValidator:
     """Input validation and sanitization"""
     
@@ -74,45 +170,56 @@ class InputValidator:
         if len(query) > 2000:
             return False
         # Very basic HTML tag injection avoidance; enforce escaping at render.
-        if re.search(r"<\s*script", query, re.IGNORECASE):
+        # Most queries contain no "<" at all, which rules the tag out without the regex
+        if "<" in query and _SCRIPT_RE.search(query):
             return False
         return True
 
+def _new_session_id() -> str:
+    """32-char URL-safe id carrying 192 random bits.
+
+    24 bytes encode to base64 without padding, so unlike token_urlsafe there is
+    nothing to strip.
+    """
+    return base64.urlsafe_b64encode(secrets.token_bytes(24)).decode('ascii')
+
+@dataclass(slots=True)
+class _Session:
+    """Per-session state; slots keep it a fraction of the size of a dict."""
+    client_id: str
+    created_at: float
+    last_accessed: float
+
 class SessionManager:
     """Secure session management"""
-    def __init__(self, secret_key: str, lifetime: int):
+    def __init__(self, secret_key: str, lifetime: int, max_sessions: int = 100_000):
         self.secret_key = secret_key
         self.lifetime = lifetime
-        self.sessions: Dict[str, Dict[str, Any]] = {}
+        # Sessions expire `lifetime` seconds after creation; expired ones are purged on
+        # every insert, and past max_sessions the least recently used are evicted
+        # Monotonic, so wall-clock adjustments can't expire or extend sessions
+        self.sessions: TTLCache = TTLCache(maxsize=max_sessions, ttl=lifetime, timer=time.monotonic)
     
     def create_session(self, client_id: str) -> str:
         """Create a new session"""
-        session_id = secrets.token_urlsafe(32)
-        self.sessions[session_id] = {
-            'client_id': client_id,
-            'created_at': time.time(),
-            'last_accessed': time.time()
-        }
+        session_id = _new_session_id()
+        # Inside the block the cache's clock is read once and frozen, so the
+        # timestamps and the expiry purge all share that single reading
+        with self.sessions.timer as current_time:
+            self.sessions[session_id] = _Session(client_id, current_time, current_time)
         return session_id
     
     def validate_session(self, session_id: str) -> bool:
         """Validate session and check expiration"""
-        if session_id not in self.sessions:
-            return False
-        
-        session = self.sessions[session_id]
-        current_time = time.time()
-        
-        # Check session expiration
-        if current_time - session['created_at'] > self.lifetime:
-            del self.sessions[session_id]
+        with self.sessions.timer as current_time:
+            session = self.sessions.get(session_id)
+        if session is None:
             return False
         
         # Update last accessed time
-        session['last_accessed'] = current_time
+        session.last_accessed = current_time
         return True
     
     def end_session(self, session_id: str) -> None:
         """End a session"""
-        if session_id in self.sessions:
-            del self.sessions[session_id]
\ No newline at end of file
+        self.sessions.pop(session_id, None)
@@ -1,7 +1,10 @@
+import asyncio
+import time
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 from src.agent_new2 import AIAgent
 from src.config import Config
+from src.memory import AgentMemory
 
 
 class TestAIAgent:
@@ -21,7 +24,8 @@ class TestAIAgent:
         mock_llm.assert_called_once_with(
             base_url=config.ollama_host,
             model=config.ollama_model,
-            temperature=0.7
+            temperature=0.7,
+            seed=42
         )
 
     @patch('src.agent_new2.ChatOllama', side_effect=Exception("Connection failed"))
@@ -49,13 +53,13 @@ class TestAIAgent:
         """Test query with working LLM"""
         mock_llm = MagicMock()
         mock_llm_class.return_value = mock_llm
-        mock_llm.invoke.return_value = "Test response"
+        mock_llm.ainvoke = AsyncMock(return_value="Test response")
 
         with patch('src.agent_new2.RAGSystem') as mock_rag_class:
             mock_rag = MagicMock()
             mock_rag_class.return_value = mock_rag
             mock_retriever = MagicMock()
-            mock_retriever.get_relevant_documents.return_value = []
+            mock_retriever.aget_relevant_documents = AsyncMock(return_value=[])
             mock_rag.get_retriever.return_value = mock_retriever
 
             agent = AIAgent()
@@ -64,6 +68,73 @@ class TestAIAgent:
             assert response["answer"] == "Test response"
             assert response["source_documents"] == []
 
+    @patch('src.agent_new2.ChatOllama')
+    @patch('src.agent_new2.RAGSystem')
+    @patch('src.agent_new2.CacheManager')
+    def test_query_uses_cached_response(self, mock_cache_class, mock_rag_class, mock_llm_class):
+        """Test that a cached answer skips the LLM call"""
+        mock_llm = MagicMock()
+        mock_llm_class.return_value = mock_llm
+        mock_cache = MagicMock()
+        mock_cache_class.return_value = mock_cache
+        mock_cache.get.return_value = "Cached response"
+        mock_rag_class.return_value.get_retriever.return_value.aget_relevant_documents = AsyncMock(return_value=[])
+
+        agent = AIAgent()
+        response = agent.query("test question")
+
+        assert response["answer"] == "Cached response"
+        mock_llm.ainvoke.assert_not_called()
+        mock_cache.set.assert_not_called()
+
+    @patch('src.agent_new2.ChatOllama')
+    @patch('src.agent_new2.RAGSystem')
+    @patch('src.agent_new2.CacheManager')
+    def test_overlapping_queries_keep_turns_paired(self, mock_cache_class, mock_rag_class, mock_llm_class):
+        """Test that concurrent queries neither interleave history nor see each other's question"""
+        mock_cache_class.return_value.get.return_value = None
+        mock_rag_class.return_value.get_retriever.return_value.aget_relevant_documents = AsyncMock(return_value=[])
+        prompts = []
+
+        async def fake_ainvoke(messages):
+            prompts.append([m.content for m in messages])
+            await asyncio.sleep(0)
+            return f"answer to {messages[-1].content}"
+
+        mock_llm_class.return_value.ainvoke = fake_ainvoke
+        agent = AIAgent()
+
+        async def scenario():
+            return await asyncio.gather(agent.aquery("A"), agent.aquery("B"))
+
+        asyncio.run(scenario())
+        history = [m.content for m in agent.memory.get_messages()]
+        assert history == ["A", "answer to A", "B", "answer to B"]
+        assert [prompt[1:] for prompt in prompts] == [["A"], ["B"]]
+
+    @patch('src.agent_new2.ChatOllama')
+    @patch('src.agent_new2.RAGSystem')
+    @patch('src.agent_new2.CacheManager')
+    def test_overlapping_queries_summarize_once(self, mock_cache_class, mock_rag_class, mock_llm_class):
+        """Test that a full window is summarized once by overlapping queries"""
+        mock_cache_class.return_value.get.return_value = None
+        mock_rag_class.return_value.get_retriever.return_value.aget_relevant_documents = AsyncMock(return_value=[])
+        mock_llm = mock_llm_class.return_value
+        mock_llm.ainvoke = AsyncMock(return_value="answer")
+        # Slow enough that the second query checks the window mid-summary
+        mock_llm.invoke.side_effect = lambda messages: time.sleep(0.05) or "summary"
+
+        agent = AIAgent()
+        agent.memory = AgentMemory(max_messages=4)
+        for i in range(4):
+            agent.memory.add_message(f"message {i}", is_human=i % 2 == 0)
+
+        async def scenario():
+            return await asyncio.gather(agent.aquery("A"), agent.aquery("B"))
+
+        asyncio.run(scenario())
+        mock_llm.invoke.assert_called_once()
+
     def test_clear_memory(self):
         """Test memory clearing"""
         with patch('src.agent_new2.ChatOllama', side_effect=Exception("Failed")):
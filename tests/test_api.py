@@ -1,5 +1,6 @@
 import os
 import pytest
+from unittest.mock import patch
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
@@ -35,6 +36,14 @@ client = TestClient(app)
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
+@pytest.fixture(autouse=True)
+def no_rate_limit():
+    """These tests exercise the API, not /query's per-client rate limit"""
+    app.state.limiter.enabled = False
+    yield
+    app.state.limiter.enabled = True
+
+
 @pytest.fixture(scope="function")
 def test_user():
     """Create a test user"""
@@ -106,6 +115,17 @@ class TestAuthAPI:
         })
         assert response.status_code == 401
 
+    def test_password_verification_is_cached(self):
+        """Only successful bcrypt checks are remembered"""
+        import web_new
+        hashed = pwd_context.hash("cachedpass")
+        with patch.object(web_new.pwd_context, "verify", wraps=web_new.pwd_context.verify) as verify:
+            assert web_new.verify_password("cachedpass", hashed)
+            assert web_new.verify_password("cachedpass", hashed)
+            assert not web_new.verify_password("wrongpass", hashed)
+            assert not web_new.verify_password("wrongpass", hashed)
+        assert verify.call_count == 3
+
 
 class TestProtectedAPI:
     def test_get_conversations_unauthorized(self):
@@ -121,6 +141,16 @@ class TestProtectedAPI:
         assert data["status"] == "healthy"
         assert "components" in data
 
+    def test_metrics_accepts_static_scrape_token(self):
+        """METRICS_TOKEN authorizes /metrics without a user JWT"""
+        import web_new
+        with patch.object(web_new.config, "metrics_token", "scrape-secret"):
+            response = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+            assert response.status_code == 200
+            assert b"http_requests_total" in response.content
+            response = client.get("/metrics", headers={"Authorization": "Bearer wrong"})
+            assert response.status_code == 401
+
 
 class TestConversationsAPI:
     def get_auth_token(self):
@@ -165,4 +195,141 @@ class TestConversationsAPI:
         response = client.get("/conversations", headers={"Authorization": f"Bearer {token}"})
         assert response.status_code == 200
         data = response.json()
-        assert len(data["conversations"]) >= 1
\ No newline at end of file
+        assert len(data["conversations"]) >= 1
+
+    def test_token_validation_is_cached(self):
+        """Repeated requests with one token decode it once"""
+        import web_new
+        token = self.get_auth_token()
+        web_new._token_cache.clear()
+        headers = {"Authorization": f"Bearer {token}"}
+        with patch("web_new.jwt.decode", wraps=web_new.jwt.decode) as decode:
+            assert client.get("/conversations", headers=headers).status_code == 200
+            assert client.get("/conversations", headers=headers).status_code == 200
+        assert decode.call_count == 1
+
+    def test_query_appends_to_existing_conversation(self):
+        """Follow-up queries add to the same conversation in one commit"""
+        from sqlalchemy.orm import Session as _Session
+        token = self.get_auth_token()
+        headers = {"Authorization": f"Bearer {token}"}
+        first = client.post("/query", json={"question": "First question"}, headers=headers)
+        conversation_id = first.json()["conversation_id"]
+
+        with patch.object(_Session, "commit", autospec=True, side_effect=_Session.commit) as commit:
+            second = client.post("/query", json={"question": "Second question", "conversation_id": conversation_id}, headers=headers)
+        assert second.status_code == 200
+        assert second.json()["conversation_id"] == conversation_id
+        assert commit.call_count == 1
+
+        response = client.get(f"/conversations/{conversation_id}/messages", headers=headers)
+        assert [m["content"] for m in response.json()["messages"] if m["role"] == "human"] == ["First question", "Second question"]
+
+    def test_conversation_list_served_from_cache(self):
+        """A cached listing skips the database; /query invalidates it"""
+        token = self.get_auth_token()
+        headers = {"Authorization": f"Bearer {token}"}
+        cached = {"conversations": [{"id": 1, "title": "cached", "created_at": None, "updated_at": None}]}
+        with patch("web_new.cache_manager.get", return_value=cached), \
+             patch("web_new.list_user_conversations") as listing:
+            response = client.get("/conversations", headers=headers)
+        assert response.json() == cached
+        listing.assert_not_called()
+
+        with patch("web_new.cache_manager.incr") as incr:
+            client.post("/query", json={"question": "Invalidate"}, headers=headers)
+        assert incr.call_args.args[0].startswith("conv_list_version:")
+
+    def test_conversation_list_cached_per_version(self):
+        """A listing is cached under the version it was read at, so a bump supersedes it"""
+        token = self.get_auth_token()
+        headers = {"Authorization": f"Bearer {token}"}
+        with patch("web_new.cache_manager.get_counter", return_value=3), \
+             patch("web_new.cache_manager.set") as cache_set:
+            client.get("/conversations", headers=headers)
+        assert cache_set.call_args.args[0].endswith(":3")
+
+    def test_stale_report_served_while_refreshing(self):
+        """An expired report is still returned and triggers one refresh"""
+        token = self.get_auth_token()
+        headers = {"Authorization": f"Bearer {token}"}
+        stale = {"status": "success", "version": 3, "data": {"framework": "fastapi"}, "fresh_until": 0}
+        with patch("web_new.cache_manager.get_many", return_value=[stale, None, None]), \
+             patch("web_new.generate_report_background") as regenerate:
+            response = client.get("/report", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["report"] == stale
+        regenerate.assert_called_once()
+
+    def test_upload_decodes_across_chunks(self):
+        """Multi-byte characters split between read chunks decode intact"""
+        token = self.get_auth_token()
+        headers = {"Authorization": f"Bearer {token}"}
+        text = "perché " * 50
+        with patch("web_new.UPLOAD_CHUNK_SIZE", 7), patch("web_new.agent.ingest_documents") as ingest:
+            response = client.post("/upload", files={"file": ("notes.txt", text.encode(), "text/plain")}, headers=headers)
+        assert response.status_code == 200
+        ingest.assert_called_once_with([text])
+
+    def test_upload_rejects_oversized_and_invalid_files(self):
+        """Size and encoding errors keep their status codes"""
+        token = self.get_auth_token()
+        headers = {"Authorization": f"Bearer {token}"}
+        with patch("web_new.UPLOAD_MAX_SIZE", 16), patch("web_new.agent.ingest_documents") as ingest:
+            response = client.post("/upload", files={"file": ("big.txt", b"x" * 17, "text/plain")}, headers=headers)
+            assert response.status_code == 413
+            response = client.post("/upload", files={"file": ("bad.txt", b"\xff\xfe", "text/plain")}, headers=headers)
+            assert response.status_code == 400
+        ingest.assert_not_called()
+
+    def test_stats_counts_user_activity(self):
+        """User stats reflect a new conversation and its two messages"""
+        token = self.get_auth_token()
+        headers = {"Authorization": f"Bearer {token}"}
+        before = client.get("/stats", headers=headers).json()["user_stats"]
+        client.post("/query", json={"question": "Count me"}, headers=headers)
+        after = client.get("/stats", headers=headers).json()["user_stats"]
+        assert after["conversations_count"] == before["conversations_count"] + 1
+        assert after["messages_count"] == before["messages_count"] + 2
+
+    def test_cached_user_survives_commits(self):
+        """The user cached with a token stays readable after a request commits"""
+        token = self.get_auth_token()
+        headers = {"Authorization": f"Bearer {token}"}
+        assert client.post("/query", json={"question": "Commit something"}, headers=headers).status_code == 200
+        response = client.get("/users/me", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["username"] == "convuser"
+
+    def test_messages_streamed_in_batches(self):
+        """Messages stream as one JSON document"""
+        token = self.get_auth_token()
+        headers = {"Authorization": f"Bearer {token}"}
+        conversation_id = client.post("/query", json={"question": "Stream me"}, headers=headers).json()["conversation_id"]
+        with patch("web_new.MESSAGES_STREAM_BATCH", 1):
+            response = client.get(f"/conversations/{conversation_id}/messages", headers=headers)
+        assert response.status_code == 200
+        assert [m["role"] for m in response.json()["messages"]] == ["human", "assistant"]
+
+        response = client.get("/conversations/999999/messages", headers=headers)
+        assert response.status_code == 404
+
+    def test_message_stream_errors_are_not_hidden(self):
+        """A failing first batch is a 500; a later failure aborts the response"""
+        from datetime import datetime
+        from unittest.mock import MagicMock
+        token = self.get_auth_token()
+        headers = {"Authorization": f"Bearer {token}"}
+        conversation_id = client.post("/query", json={"question": "Break me"}, headers=headers).json()["conversation_id"]
+        url = f"/conversations/{conversation_id}/messages"
+
+        with patch("web_new.open_conversation_messages", side_effect=RuntimeError("db down")):
+            assert client.get(url, headers=headers).status_code == 500
+
+        result = MagicMock()
+        result.fetchmany.side_effect = [[(1, "human", "hi", datetime(2025, 1, 1))], RuntimeError("db down")]
+        # The error escapes the app mid-body, so the server drops the connection
+        # rather than closing a truncated list with a 200
+        with patch("web_new.open_conversation_messages", return_value=result), \
+             pytest.raises(RuntimeError, match="db down"):
+            client.get(url, headers=headers)
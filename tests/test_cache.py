@@ -0,0 +1,110 @@
+import asyncio
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from src.cache import AsyncCacheManager, CacheManager
+from src.config import Config
+
+
+VALUE = {"when": datetime(2025, 1, 2, 3, 4, 5), "pair": (1, 2), 7: "int key"}
+
+
+@pytest.fixture
+def config(monkeypatch):
+    # No connection attempt; each test installs its own fake client
+    monkeypatch.setenv("CACHE_ENABLED", "false")
+    return Config()
+
+
+@pytest.fixture
+def cache(config):
+    store = {}
+    client = MagicMock()
+    client.setex.side_effect = lambda key, ttl, value: store.__setitem__(key, value) or True
+    client.pipeline.return_value.get.side_effect = lambda key: MagicMock(
+        pttl=lambda _key: MagicMock(execute=lambda: [store.get(key), 60_000])
+    )
+    manager = CacheManager(config)
+    manager.redis_client = client
+    return manager
+
+
+class TestCacheManager:
+    """Test CacheManager's L1 and Redis tiers"""
+
+    def test_l1_and_redis_hits_are_identical(self, cache):
+        cache.set("k", VALUE)
+        from_l1 = cache.get("k")
+        cache._l1.clear()
+        from_redis = cache.get("k")
+        assert from_l1 == from_redis
+        assert from_l1 == {"when": "2025-01-02T03:04:05+00:00", "pair": [1, 2], "7": "int key"}
+
+    def test_l1_hits_are_detached(self, cache):
+        value = {"items": [1]}
+        cache.set("k", value)
+        value["items"].append(2)
+        first = cache.get("k")
+        first["items"].append(3)
+        assert cache.get("k") == {"items": [1]}
+
+
+class TestAsyncCacheManager:
+    """Test AsyncCacheManager's L1 and Redis tiers"""
+
+    def test_get_many_l1_and_redis_hits_are_identical(self, config):
+        store = {}
+
+        async def fake_set(key, value, ex=None):
+            store[key] = value
+            return True
+
+        manager = AsyncCacheManager(config)
+        manager.redis_client = MagicMock(
+            set=AsyncMock(side_effect=fake_set),
+            mget=AsyncMock(side_effect=lambda keys: [store.get(key) for key in keys]),
+        )
+
+        async def scenario():
+            await manager.set("k", VALUE)
+            from_l1 = await manager.get_many(["k", "missing"])
+            manager._l1.clear()
+            from_redis = await manager.get_many(["k", "missing"])
+            return from_l1, from_redis
+
+        from_l1, from_redis = asyncio.run(scenario())
+        assert from_l1 == from_redis
+        assert from_l1[1] is None
+
+    def test_counter_bypasses_l1(self, config):
+        store = {}
+
+        def fake_pipeline(transaction=True):
+            pipe = MagicMock()
+            pipe.__aenter__ = AsyncMock(return_value=pipe)
+            pipe.__aexit__ = AsyncMock(return_value=False)
+            pipe.incr.return_value = pipe
+            pipe.expire.return_value = pipe
+
+            async def execute():
+                key = pipe.incr.call_args.args[0]
+                store[key] = str(int(store.get(key, 0)) + 1).encode()
+                return [int(store[key]), True]
+
+            pipe.execute = execute
+            return pipe
+
+        manager = AsyncCacheManager(config)
+        manager.redis_client = MagicMock(
+            pipeline=fake_pipeline,
+            get=AsyncMock(side_effect=lambda key: store.get(key)),
+        )
+
+        async def scenario():
+            before = await manager.get_counter("v")
+            await manager.incr("v")
+            # Another worker bumps the counter behind this process's back
+            store["v"] = b"5"
+            return before, await manager.get_counter("v")
+
+        assert asyncio.run(scenario()) == (0, 5)
@@ -1,7 +1,7 @@
 import pytest
 import os
 from unittest.mock import patch
-from src.config import Config, SecurityConfig
+from src.config import Config, SecurityConfig, get_config
 
 
 class TestSecurityConfig:
@@ -29,13 +29,15 @@ class TestConfig:
     @patch.dict(os.environ, {
         'OLLAMA_HOST': 'http://custom:8080',
         'OLLAMA_MODEL': 'llama2:7b',
-        'RATE_LIMIT': '100'
+        'RATE_LIMIT': '100',
+        'REDIS_POOL_SIZE': '8'
     })
     def test_environment_variables(self):
         config = Config()
         assert config.ollama_host == 'http://custom:8080'
         assert config.ollama_model == 'llama2:7b'
         assert config.rate_limit == 100
+        assert config.redis_pool_size == 8
 
     def test_invalid_ollama_host(self):
         with patch.dict(os.environ, {'OLLAMA_HOST': 'invalid-url'}):
@@ -76,4 +78,14 @@ class TestConfig:
         config = Config()
         headers = config.get_security_headers(debug=False)
         csp = headers['Content-Security-Policy']
-        assert "unsafe-inline" not in csp
\ No newline at end of file
+        assert "unsafe-inline" not in csp
+
+    def test_security_headers_built_once(self):
+        """Test headers are precomputed per mode rather than rebuilt per call"""
+        config = Config()
+        assert config.get_security_headers() is config.get_security_headers()
+        assert config.get_security_headers(debug=True) is not config.get_security_headers()
+
+    def test_get_config_is_cached(self):
+        get_config.cache_clear()
+        assert get_config() is get_config()
@@ -0,0 +1,64 @@
+import pytest
+from langchain_core.messages import SystemMessage
+from src.memory import AgentMemory
+
+
+def fill(memory, count):
+    for i in range(count):
+        memory.add_message(f"message {i}", is_human=i % 2 == 0)
+
+
+class TestAgentMemory:
+    """Test AgentMemory's rolling window"""
+
+    def test_window_is_bounded(self):
+        memory = AgentMemory(max_messages=4)
+        fill(memory, 6)
+        assert [m.content for m in memory.get_messages()] == [f"message {i}" for i in range(2, 6)]
+
+    def test_is_full(self):
+        memory = AgentMemory(max_messages=4)
+        fill(memory, 3)
+        assert not memory.is_full()
+        fill(memory, 1)
+        assert memory.is_full()
+
+    def test_summarize_older_replaces_older_half(self):
+        memory = AgentMemory(max_messages=4)
+        fill(memory, 4)
+        seen = []
+
+        def summarizer(messages):
+            seen.extend(m.content for m in messages)
+            return "short version"
+
+        memory.summarize_older(summarizer)
+        messages = memory.get_messages()
+        assert seen == ["message 0", "message 1"]
+        assert isinstance(messages[0], SystemMessage)
+        assert "short version" in messages[0].content
+        assert [m.content for m in messages[1:]] == ["message 2", "message 3"]
+        assert not memory.is_full()
+
+    def test_failing_summarizer_keeps_messages(self):
+        memory = AgentMemory(max_messages=4)
+        fill(memory, 4)
+
+        def summarizer(messages):
+            raise RuntimeError("LLM unavailable")
+
+        with pytest.raises(RuntimeError):
+            memory.summarize_older(summarizer)
+        assert [m.content for m in memory.get_messages()] == [f"message {i}" for i in range(4)]
+
+    def test_appends_during_summary_are_kept(self):
+        memory = AgentMemory(max_messages=4)
+        fill(memory, 4)
+
+        def summarizer(messages):
+            # The event loop appends while the summary is being written
+            memory.add_message("late", is_human=True)
+            return "short version"
+
+        memory.summarize_older(summarizer)
+        assert [m.content for m in memory.get_messages()[1:]] == ["message 2", "message 3", "late"]
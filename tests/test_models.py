@@ -1,5 +1,5 @@
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect
 from sqlalchemy.orm import sessionmaker
 from src.models import Base, User, Conversation, Message, get_database_url
 
@@ -134,4 +134,15 @@ class TestMessage:
         assert conversation.messages[0].content == "Test message"
 
         # Test relationship from message to conversation
-        assert message.conversation.title == "Test Conversation"
\ No newline at end of file
+        assert message.conversation.title == "Test Conversation"
+
+
+class TestIndexes:
+    def test_composite_indexes(self, db_session):
+        """Test composite indexes backing the conversation and message listings"""
+        inspector = inspect(db_session.get_bind())
+        conversation_indexes = {ix["name"]: ix["column_names"] for ix in inspector.get_indexes("conversations")}
+        message_indexes = {ix["name"]: ix["column_names"] for ix in inspector.get_indexes("messages")}
+
+        assert conversation_indexes["ix_conversations_user_updated"] == ["user_id", "updated_at"]
+        assert message_indexes["ix_messages_conv_created"] == ["conversation_id", "created_at"]
@@ -0,0 +1,111 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from src.rag import RAGSystem
+
+
+class DictCache:
+    """In-memory stand-in for CacheManager's bulk API"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get_many(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def set_many(self, items, ttl=None):
+        self.data.update(items)
+        return True
+
+
+@pytest.fixture
+def embedder():
+    return MagicMock(wraps=DeterministicFakeEmbedding(size=16))
+
+
+@pytest.fixture
+def make_rag(tmp_path, embedder):
+    """RAGSystem persisting under tmp_path with a fake embedder"""
+    def make(name="chroma", cache=None):
+        with patch("src.rag.PERSIST_DIRECTORY", str(tmp_path / name)):
+            rag = RAGSystem(cache=cache)
+            rag.embeddings = embedder
+            rag._ensure_vectorstore()
+        return rag
+    return make
+
+
+def stored_count(rag):
+    return rag.vectorstore._collection.count()
+
+
+class TestSplit:
+    """Test RAGSystem._split"""
+
+    def test_short_documents_match_splitter(self, make_rag):
+        rag = make_rag()
+        docs = ["plain", "  padded text \n", "   ", "line one\n\nline two", "x" * rag.chunk_size]
+        for doc in docs:
+            expected = rag.text_splitter.split_documents([Document(page_content=doc)])
+            assert [c.page_content for c in rag._split([doc])] == [c.page_content for c in expected]
+
+    def test_long_documents_are_split_in_order(self, make_rag):
+        rag = make_rag()
+        long_doc = " ".join(f"word{i}" for i in range(1000))
+        chunks = rag._split(["first", long_doc, "last"])
+        assert chunks[0].page_content == "first"
+        assert chunks[-1].page_content == "last"
+        assert len(chunks) > 3
+
+
+class TestIngest:
+    """Test RAGSystem.ingest_documents"""
+
+    def test_duplicates_and_reingests_are_skipped(self, make_rag, embedder):
+        rag = make_rag()
+        rag.ingest_documents(["alpha", "beta", "alpha"])
+        assert stored_count(rag) == 2
+        embedded = [text for call in embedder.embed_documents.call_args_list for text in call.args[0]]
+        assert sorted(embedded) == ["alpha", "beta"]
+
+        embedder.embed_documents.reset_mock()
+        rag.ingest_documents(["beta", "gamma"])
+        assert stored_count(rag) == 3
+        embedder.embed_documents.assert_called_once_with(["gamma"])
+
+    def test_inserts_in_batches(self, make_rag):
+        rag = make_rag()
+        with patch("src.rag.INSERT_BATCH", 2), \
+             patch.object(rag, "_embed_with_cache", wraps=rag._embed_with_cache) as embed:
+            rag.ingest_documents([f"doc {i}" for i in range(5)])
+        assert [len(call.args[0]) for call in embed.call_args_list] == [2, 2, 1]
+        assert stored_count(rag) == 5
+
+    def test_embeddings_are_reused_from_cache(self, make_rag, embedder):
+        cache = DictCache()
+        make_rag("first", cache=cache).ingest_documents(["alpha", "beta"])
+        assert len(cache.data) == 2
+
+        embedder.embed_documents.reset_mock()
+        rag = make_rag("second", cache=cache)
+        rag.ingest_documents(["alpha", "beta"])
+        embedder.embed_documents.assert_not_called()
+        assert stored_count(rag) == 2
+
+
+class TestWarmup:
+    """Test warmup on construction"""
+
+    def test_warms_up_existing_index(self, tmp_path):
+        (tmp_path / "chroma").mkdir()
+        with patch("src.rag.PERSIST_DIRECTORY", str(tmp_path / "chroma")), \
+             patch.object(RAGSystem, "warmup") as warmup:
+            RAGSystem()
+        warmup.assert_called_once()
+
+    def test_no_warmup_without_index(self, tmp_path):
+        with patch("src.rag.PERSIST_DIRECTORY", str(tmp_path / "missing")), \
+             patch.object(RAGSystem, "warmup") as warmup:
+            RAGSystem()
+        warmup.assert_not_called()
@@ -0,0 +1,118 @@
+import os
+import pytest
+from unittest.mock import patch
+from src.scanner import ProjectScanner
+
+
+@pytest.fixture
+def project(tmp_path):
+    def make(files):
+        for name, content in files.items():
+            path = tmp_path / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+        scanner = ProjectScanner(str(tmp_path))
+        scanner.scan_files()
+        return scanner
+    return make
+
+
+class TestScanFiles:
+    """Test ProjectScanner.scan_files"""
+
+    def test_filters_dirs_files_and_extensions(self, project, tmp_path):
+        scanner = project({
+            'app.py': '',
+            'README.MD': '',
+            'image.png': '',
+            '.env': '',
+            'node_modules/lib.js': '',
+            'pkg/sub/mod.ts': '',
+        })
+        found = sorted(os.path.relpath(p, tmp_path) for p in scanner.files)
+        assert found == ['README.MD', 'app.py', os.path.join('pkg', 'sub', 'mod.ts')]
+
+
+class TestDetectFramework:
+    """Test ProjectScanner.detect_framework"""
+
+    def test_detects_framework(self, project):
+        scanner = project({'pyproject.toml': 'dependencies = ["fastapi>=0.104"]\n'})
+        assert scanner.detect_framework() == 'FastAPI'
+        assert scanner.framework == 'FastAPI'
+
+    def test_priority_within_file(self, project):
+        # React appears first in the text, but Django has priority
+        scanner = project({'package.json': '{"react": "18"}\n# django==4.2\n'})
+        assert scanner.detect_framework() == 'Django'
+
+    def test_case_insensitive(self, project):
+        scanner = project({'setup.cfg': 'install_requires = Flask>=2.0\n'})
+        assert scanner.detect_framework() == 'Flask'
+
+    def test_unknown(self, project):
+        scanner = project({'README.md': 'nothing to see here\n'})
+        assert scanner.detect_framework() == 'unknown'
+
+    def test_match_across_chunk_boundary(self, project, monkeypatch):
+        monkeypatch.setattr('src.scanner._READ_CHUNK', 8)
+        scanner = project({'setup.cfg': 'install_requires = Django>=4.2\n'})
+        assert scanner.detect_framework() == 'Django'
+
+    def test_priority_without_hyperscan(self, project, monkeypatch):
+        monkeypatch.setattr('src.scanner.hyperscan', None)
+        scanner = project({'package.json': '{"react": "18"}\n# django==4.2\n'})
+        assert scanner.detect_framework() == 'Django'
+
+    def test_manifest_checked_first(self, project):
+        scanner = project({
+            'README.md': 'Built with react\n',
+            'backend/pyproject.toml': 'dependencies = ["django>=4.2"]\n',
+        })
+        assert scanner.detect_framework() == 'Django'
+
+    def test_skips_large_files(self, project):
+        scanner = project({'bundle.js': 'x' * (512 * 1024) + ' react'})
+        assert scanner.detect_framework() == 'unknown'
+
+
+class TestExtractConfig:
+    """Test ProjectScanner.extract_config"""
+
+    def test_collects_sensitive_key_names_only(self, project):
+        scanner = project({'config.yml': 'DB_PASSWORD: hunter2\nname: demo\n  Api_Key = abc\ndebug: true\n'})
+        assert scanner.extract_config() == {'config.yml': ['api_key', 'db_password']}
+
+    def test_skips_unrelated_files(self, project):
+        scanner = project({'notes.md': 'password: hunter2\n'})
+        assert scanner.extract_config() == {}
+
+    def test_skips_large_files(self, project):
+        scanner = project({'config.yml': 'password: x\n' + '#' * (256 * 1024)})
+        assert scanner.extract_config() == {}
+
+
+class TestSummarize:
+    """Test ProjectScanner.summarize caching"""
+
+    def test_reuses_summary_until_files_change(self, project, tmp_path):
+        scanner = project({'pyproject.toml': 'dependencies = ["flask>=2"]\n'})
+        first = scanner.summarize()
+        assert first['framework'] == 'Flask'
+
+        with patch.object(scanner, 'detect_framework') as detect:
+            assert scanner.summarize() is first
+            detect.assert_not_called()
+
+        manifest = tmp_path / 'pyproject.toml'
+        manifest.write_text('dependencies = ["django>=4.2"]\n')
+        os.utime(manifest, ns=(0, 0))
+        assert scanner.summarize()['framework'] == 'Django'
+
+    def test_invalidate(self, project):
+        scanner = project({'pyproject.toml': 'dependencies = ["flask>=2"]\n'})
+        scanner.summarize()
+        scanner.invalidate()
+        with patch.object(scanner, 'detect_framework', return_value='Flask') as detect:
+            scanner.summarize()
+            detect.assert_called_once()
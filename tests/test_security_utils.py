@@ -0,0 +1,142 @@
+import re
+import pytest
+from unittest.mock import MagicMock, patch
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from src.security import InputValidator, SecurityMiddleware, SessionManager
+
+
+class TestSessionManager:
+    """Test SessionManager"""
+
+    def test_create_and_validate(self):
+        clock = [1000.0]
+        with patch('src.security.time.monotonic', lambda: clock[0]):
+            manager = SessionManager('secret', lifetime=60)
+            session_id = manager.create_session('client')
+            clock[0] = 1010.0
+            assert manager.validate_session(session_id)
+            assert not manager.validate_session('unknown')
+        session = manager.sessions[session_id]
+        assert (session.client_id, session.created_at, session.last_accessed) == ('client', 1000.0, 1010.0)
+
+    def test_session_ids_are_unique_and_url_safe(self):
+        manager = SessionManager('secret', lifetime=60)
+        ids = {manager.create_session('client') for _ in range(100)}
+        assert len(ids) == 100
+        assert all(len(i) == 32 and re.fullmatch(r'[A-Za-z0-9_-]+', i) for i in ids)
+
+    def test_end_session(self):
+        manager = SessionManager('secret', lifetime=60)
+        session_id = manager.create_session('client')
+        manager.end_session(session_id)
+        assert not manager.validate_session(session_id)
+
+    def test_session_expires(self):
+        clock = [1000.0]
+        with patch('src.security.time.monotonic', lambda: clock[0]):
+            manager = SessionManager('secret', lifetime=60)
+            session_id = manager.create_session('client')
+            clock[0] = 1059.0
+            assert manager.validate_session(session_id)
+            clock[0] = 1061.0
+            assert not manager.validate_session(session_id)
+
+    def test_expired_sessions_are_purged(self):
+        clock = [1000.0]
+        with patch('src.security.time.monotonic', lambda: clock[0]):
+            manager = SessionManager('secret', lifetime=60)
+            old = manager.create_session('a')
+            clock[0] = 1061.0
+            recent = manager.create_session('b')
+            assert old not in manager.sessions
+            assert recent in manager.sessions
+            assert len(manager.sessions) == 1
+
+    def test_capped_size(self):
+        manager = SessionManager('secret', lifetime=60, max_sessions=2)
+        first = manager.create_session('a')
+        manager.create_session('b')
+        manager.create_session('c')
+        assert len(manager.sessions) == 2
+        assert not manager.validate_session(first)
+
+
+class TestInputValidator:
+    """Test InputValidator.validate_query"""
+
+    @pytest.mark.parametrize('query,valid', [
+        ('What is FastAPI?', True),
+        ('is 1 < 2?', True),
+        ('<b>bold</b>', True),
+        ('<script>alert(1)</script>', False),
+        ('< SCRIPT src=x>', False),
+        ('', False),
+        ('   ', False),
+        ('a' * 2001, False),
+    ])
+    def test_validate_query(self, query, valid):
+        assert InputValidator.validate_query(query) is valid
+
+
+@pytest.fixture
+def secured_client():
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.get("/framed")
+    async def framed():
+        return JSONResponse({"ok": True}, headers={'X-Frame-Options': 'SAMEORIGIN'})
+
+    @app.post("/echo")
+    async def echo(payload: dict):
+        return payload
+
+    config = MagicMock()
+    config.security.ALLOWED_HOSTS = ['testserver', 'localhost']
+    config.max_request_size = 64
+    config.get_security_headers.return_value = {'X-Frame-Options': 'DENY'}
+    app.add_middleware(SecurityMiddleware, config=config)
+    return TestClient(app)
+
+
+class TestSecurityMiddleware:
+    """Test SecurityMiddleware"""
+
+    def test_adds_security_headers(self, secured_client):
+        response = secured_client.get("/ping")
+        assert response.status_code == 200
+        assert response.headers['X-Frame-Options'] == 'DENY'
+
+    def test_overrides_app_header(self, secured_client):
+        response = secured_client.get("/framed")
+        assert response.headers.get_list('X-Frame-Options') == ['DENY']
+
+    def test_rejects_unknown_host(self, secured_client):
+        response = secured_client.get("/ping", headers={'host': 'evil.com'})
+        assert response.status_code == 400
+        assert response.json() == {"detail": "Invalid host header"}
+        assert response.headers['X-Frame-Options'] == 'DENY'
+
+    def test_allows_host_with_port(self, secured_client):
+        response = secured_client.get("/ping", headers={'host': 'localhost:8000'})
+        assert response.status_code == 200
+
+    def test_rejects_large_body(self, secured_client):
+        response = secured_client.post("/echo", json={"data": "x" * 100})
+        assert response.status_code == 413
+
+    @pytest.mark.parametrize('length,status', [
+        ('abc', 400),
+        ('-1', 400),
+        ('1e3', 400),
+        ('9' * 5000, 413),
+        ('0000065', 413),
+    ])
+    def test_content_length_parsing(self, secured_client, length, status):
+        response = secured_client.post("/echo", content=b"{}", headers={'content-length': length, 'content-type': 'application/json'})
+        assert response.status_code == status
@@ -50,6 +50,18 @@ def test_health():
     assert response.status_code == 200
     assert response.json()["status"] == "healthy"
 
+def test_index_revalidates_with_etag():
+    response = client.get("/")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    response = client.get("/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+def test_docs_disabled_by_default():
+    response = client.get("/docs")
+    assert response.status_code == 404
+
 def test_query_unauthorized():
     response = client.post("/query", json={"question": "test"})
     assert response.status_code == 401
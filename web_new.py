@@ -4,15 +4,23 @@ import asyncio
 import logging
 import datetime
 import time
+import codecs
+import hashlib
+import hmac
+import secrets
+import threading
+import os
+from concurrent.futures import ThreadPoolExecutor
 from logging.handlers import RotatingFileHandler
 import uvicorn
 from fastapi import FastAPI, Request, HTTPException, Response, Depends, status, UploadFile, File
 import aiofiles
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import json
+import orjson
 from pythonjsonlogger import jsonlogger
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
@@ -25,17 +33,27 @@ from typing import Optional
 from pydantic import BaseModel
 from prometheus_client import Counter, Histogram, Gauge, generate_latest, CONTENT_TYPE_LATEST
 from contextlib import asynccontextmanager
+from cachetools import TTLCache
 
 # Add parent directory to Python path for local imports
 sys.path.append(str(Path(__file__).parent))
 
-from src.cache import CacheManager, get_report_cache_key
+from src.cache import (
+    AsyncCacheManager,
+    get_conversations_cache_key,
+    get_conversations_version_key,
+    get_report_cache_key,
+    get_report_error_cache_key,
+    get_report_status_cache_key,
+)
 from src.models import User as DBUser, Conversation, Message, get_db
+from sqlalchemy import func, insert, select, update
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from src.config import Config
+from starlette.concurrency import run_in_threadpool
+from src.config import get_config
 from src.agent_new2 import AIAgent
-from src.security import SessionManager, InputValidator, SecurityMiddleware
+from src.security import SessionManager, InputValidator, SecurityMiddleware, use_log_handlers
 
 # Authentication models
 class UserSchema(BaseModel):
@@ -71,26 +89,192 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Recently validated tokens -> (token exp, user). A hit skips jwt.decode and the
+# user query; the short TTL bounds how long a disabled account stays usable.
+# Only touched from the event loop (get_current_user is async), so no lock
+TOKEN_CACHE_TTL = 5
+_token_cache: TTLCache = TTLCache(maxsize=4096, ttl=TOKEN_CACHE_TTL)
+
+# Per-user conversation listings are polled by the UI. They are cached under a
+# per-user version that /query bumps after writing, so a listing read before the
+# write can only land under the old version, which no later request looks up
+CONVERSATIONS_CACHE_TTL = 10
+# Conversations returned by /conversations, most recent first
+CONVERSATION_LIST_LIMIT = 50
+# Messages are streamed in batches of this many rows
+MESSAGES_STREAM_BATCH = 200
+
 # In-memory user database (for demo; use real DB in production)
 # REMOVED: fake_users_db replaced with database models
 
+# Successful bcrypt checks, remembered briefly so repeat logins skip the deliberately
+# slow hash. Keys are an HMAC under a per-process random key, never the password
+# itself or a plain fast hash of it; failures are not cached
+PASSWORD_CACHE_TTL = 300
+_password_cache: TTLCache = TTLCache(maxsize=10_000, ttl=PASSWORD_CACHE_TTL)
+_password_cache_lock = threading.Lock()
+_password_cache_key = secrets.token_bytes(32)
+
+# bcrypt holds a core for tens of milliseconds; async handlers run it here instead
+# of on the event loop
+_bcrypt_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="bcrypt")
+
+def _password_cache_hit(plain_password, hashed_password):
+    cache_key = hmac.new(
+        _password_cache_key,
+        hashed_password.encode() + b"\0" + plain_password.encode(),
+        hashlib.sha256,
+    ).digest()
+    with _password_cache_lock:
+        return cache_key, bool(_password_cache.get(cache_key))
+
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    cache_key, hit = _password_cache_hit(plain_password, hashed_password)
+    if hit:
+        return True
+    verified = pwd_context.verify(plain_password, hashed_password)
+    if verified:
+        with _password_cache_lock:
+            _password_cache[cache_key] = True
+    return verified
+
+async def averify_password(plain_password, hashed_password):
+    """verify_password without blocking the event loop; cache hits skip the pool."""
+    if _password_cache_hit(plain_password, hashed_password)[1]:
+        return True
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_bcrypt_pool, verify_password, plain_password, hashed_password)
 
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+async def aget_password_hash(password):
+    """get_password_hash without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_bcrypt_pool, get_password_hash, password)
+
 def get_user(db: Session, username: str):
     return db.query(DBUser).filter(DBUser.username == username).first()
 
-def authenticate_user(db: Session, username: str, password: str):
+def load_request_user(db: Session, username: str) -> Optional[DBUser]:
+    """get_user, detached from the session.
+
+    The instance outlives the request in the token cache, and a detached one
+    keeps its loaded columns instead of being expired (and lazily reloaded on
+    first access) when the request's session commits.
+    """
     user = get_user(db, username)
+    if user is not None:
+        db.expunge(user)
+    return user
+
+async def authenticate_user(db: Session, username: str, password: str):
+    user = await run_in_threadpool(get_user, db, username)
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    if not await averify_password(password, user.hashed_password):
         return False
     return user
 
+# Database work for the async handlers. Session calls block, so handlers run these
+# through run_in_threadpool; each helper batches one handler step's queries so the
+# request hops to a worker thread once per step
+def find_registration_conflict(db: Session, username: str, email: str) -> Optional[str]:
+    if get_user(db, username):
+        return "Username already registered"
+    if db.query(DBUser).filter(DBUser.email == email).first():
+        return "Email already registered"
+    return None
+
+def save_new_user(db: Session, db_user: DBUser) -> None:
+    db.add(db_user)
+    db.commit()
+    db.refresh(db_user)
+
+def get_conversation(db: Session, user_id: int, conversation_id: int) -> Optional[Conversation]:
+    return db.query(Conversation).filter(
+        Conversation.id == conversation_id,
+        Conversation.user_id == user_id
+    ).first()
+
+def save_exchange(db: Session, user_id: int, conversation: Optional[Conversation], title: str, question: str, answer: str):
+    """Store a question and its answer in one transaction, creating the conversation
+    first if there is none. Returns (conversation id, created).
+
+    Written with Core statements: the new conversation's id comes back from the
+    INSERT itself (RETURNING where the dialect has it, else the cursor's lastrowid),
+    and nothing is reloaded afterwards.
+    """
+    created = conversation is None
+    now = datetime.now(timezone.utc)
+    try:
+        if created:
+            result = db.execute(
+                insert(Conversation).values(user_id=user_id, title=title, created_at=now, updated_at=now)
+            )
+            conversation_id = result.inserted_primary_key[0]
+        else:
+            conversation_id = conversation.id
+            # Update conversation timestamp
+            db.execute(update(Conversation).where(Conversation.id == conversation_id).values(updated_at=now))
+
+        db.execute(insert(Message), [
+            {"conversation_id": conversation_id, "role": "human", "content": question},
+            {"conversation_id": conversation_id, "role": "assistant", "content": answer},
+        ])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return conversation_id, created
+
+def list_user_conversations(db: Session, user_id: int) -> list:
+    """The user's most recently updated conversations, newest first.
+
+    Bounded so the (user_id, updated_at) index serves it as a short range scan;
+    only the listed columns are fetched, as plain rows rather than ORM objects.
+    """
+    rows = db.execute(
+        select(Conversation.id, Conversation.title, Conversation.created_at, Conversation.updated_at)
+        .where(Conversation.user_id == user_id)
+        .order_by(Conversation.updated_at.desc())
+        .limit(CONVERSATION_LIST_LIMIT)
+    ).all()
+    return [
+        {
+            "id": conv_id,
+            "title": title,
+            "created_at": created_at.isoformat() if created_at else None,
+            "updated_at": updated_at.isoformat() if updated_at else None
+        } for conv_id, title, created_at, updated_at in rows
+    ]
+
+def open_conversation_messages(db: Session, conversation_id: int):
+    """A conversation's messages as a result to be read in batches with fetchmany.
+
+    Column rows only, and a server-side cursor where the driver supports one,
+    so a long conversation is never held in memory at once.
+    """
+    return db.execute(
+        select(Message.id, Message.role, Message.content, Message.created_at)
+        .where(Message.conversation_id == conversation_id)
+        .order_by(Message.created_at)
+        .execution_options(stream_results=True, yield_per=MESSAGES_STREAM_BATCH)
+    )
+
+def count_stats(db: Session, user_id: int, include_system: bool) -> dict:
+    """All /stats counts as scalar subqueries of a single SELECT (one round trip)."""
+    counts = {
+        "user_conversations": select(func.count(Conversation.id)).where(Conversation.user_id == user_id),
+        "user_messages": select(func.count(Message.id)).join(Conversation).where(Conversation.user_id == user_id),
+    }
+    if include_system:
+        counts["total_users"] = select(func.count(DBUser.id))
+        counts["total_conversations"] = select(func.count(Conversation.id))
+        counts["total_messages"] = select(func.count(Message.id))
+    row = db.execute(select(*(query.scalar_subquery().label(name) for name, query in counts.items()))).one()
+    return dict(row._mapping)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -112,12 +296,18 @@ class Bearer401(HTTPBearer):
 
 auth_scheme = Bearer401()
 
-async def get_current_user(token: HTTPAuthorizationCredentials = Depends(auth_scheme), db: Session = Depends(get_db)):
+async def get_current_user(request: Request, token: HTTPAuthorizationCredentials = Depends(auth_scheme), db: Session = Depends(get_db)) -> DBUser:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    cache_key = hashlib.blake2b(token.credentials.encode(), digest_size=16).digest()
+    cached = _token_cache.get(cache_key)
+    if cached is not None and time.time() < cached[0]:
+        request.state.user = cached[1]
+        return cached[1]
+
     try:
         payload = jwt.decode(token.credentials, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
@@ -126,23 +316,15 @@ async def get_current_user(token: HTTPAuthorizationCredentials = Depends(auth_sc
         token_data = TokenData(username=username)
     except JWTError:
         raise credentials_exception
-    user = get_user(db, username=token_data.username)
+    user = await run_in_threadpool(load_request_user, db, token_data.username)
     if user is None:
         raise credentials_exception
-    # Convert DB model to Pydantic schema including fields used by routes
-    return UserSchema(
-        id=user.id,
-        username=user.username,
-        email=user.email,
-        created_at=user.created_at,
-        disabled=not user.is_active
-    )
+    _token_cache[cache_key] = (payload.get("exp", float("inf")), user)
+    request.state.user = user
+    return user
 
-async def get_current_active_user(current_user: UserSchema = Depends(get_current_user)):
-    if hasattr(current_user, 'disabled') and current_user.disabled:
-        raise HTTPException(status_code=400, detail="Inactive user")
-    # Se è un modello DB, controlla is_active
-    if hasattr(current_user, 'is_active') and not current_user.is_active:
+async def get_current_active_user(current_user: DBUser = Depends(get_current_user)) -> DBUser:
+    if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
@@ -177,17 +359,19 @@ security_handler = RotatingFileHandler(
     backupCount=10
 )
 security_handler.setFormatter(log_formatter)
+# Both file handlers sit behind one listener, so route only security records here
+security_handler.addFilter(logging.Filter('security'))
 
 # Console handler with human-readable format for development
 console_formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(name)s: %(message)s')
 stream_handler = logging.StreamHandler()
 stream_handler.setFormatter(console_formatter)
 
-# Configure root logger
-logging.basicConfig(
-    level=logging.DEBUG,
-    handlers=[app_handler, stream_handler]
-)
+# Configure root logger. src.security installs the root QueueHandler and its
+# listener thread on import, so request-path log calls only enqueue; the
+# formatting, rollover checks and file I/O happen on that thread, now with
+# these handlers
+use_log_handlers(app_handler, security_handler, stream_handler)
 
 # Get logger instances
 logger = logging.getLogger(__name__)
@@ -196,13 +380,14 @@ uvicorn_logger = logging.getLogger('uvicorn')
 
 # Set log levels
 logger.setLevel(logging.DEBUG)
-security_logger.addHandler(security_handler)
 security_logger.setLevel(logging.INFO)
 uvicorn_logger.setLevel(logging.DEBUG)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup code
+    await cache_manager.connect()
+    metrics_task = asyncio.create_task(refresh_metrics_snapshot())
     try:
         if config.admin_username and config.admin_password and config.admin_email:
             # Create admin user if not exists
@@ -214,7 +399,7 @@ async def lifespan(app: FastAPI):
                     admin_user = DBUser(
                         username=config.admin_username,
                         email=config.admin_email,
-                        hashed_password=get_password_hash(config.admin_password),
+                        hashed_password=await aget_password_hash(config.admin_password),
                         is_active=True
                     )
                     db.add(admin_user)
@@ -224,7 +409,17 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Admin provisioning failed: {e}")
     yield
-    # Shutdown code (if needed)
+    # Shutdown code
+    metrics_task.cancel()
+    await cache_manager.close()
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson; NON_STR_KEYS keeps parity with json.dumps"""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(
+            content, option=orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -232,16 +427,11 @@ app = FastAPI(
     description="A secure AI assistant with RAG capabilities",
     version="1.0.0",
     debug=True,
-    docs_url="/docs" if logging.root.level == logging.DEBUG else None,
+    default_response_class=ORJSONResponse,
+    docs_url="/docs" if get_config().enable_docs else None,
     lifespan=lifespan
 )
 
-# Rate limiting
-limiter = Limiter(key_func=get_remote_address)
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-app.add_middleware(SlowAPIMiddleware)
-
 start_time = time.time()
 
 # Mount static files
@@ -253,17 +443,29 @@ else:
 
 # Initialize configuration and components
 try:
-    config = Config()
+    config = get_config()
     SECRET_KEY = config.secret_key
     agent = AIAgent(config=config)
     session_manager = SessionManager(config.secret_key, config.session_lifetime)
     input_validator = InputValidator()
-    cache_manager = CacheManager(config)
+    cache_manager = AsyncCacheManager(config)
     logger.info("Application components initialized successfully")
 except Exception as e:
     logger.error(f"Failed to initialize application components: {str(e)}", exc_info=True)
     raise
 
+# Rate limiting. Counters live in Redis so every worker enforces the same window;
+# if Redis is unreachable the limiter falls back to per-process memory
+limiter = Limiter(
+    key_func=get_remote_address,
+    storage_uri=config.redis_url,
+    strategy="moving-window",
+    in_memory_fallback_enabled=True
+)
+app.state.limiter = limiter
+app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+app.add_middleware(SlowAPIMiddleware)
+
 # Add security middleware
 app.add_middleware(SecurityMiddleware, config=config, debug=app.debug)
 
@@ -291,24 +493,49 @@ USER_REGISTRATIONS = Counter('user_registrations_total', 'Total user registratio
 CONVERSATION_COUNT = Counter('conversations_total', 'Total conversations created')
 MESSAGE_COUNT = Counter('messages_total', 'Total messages sent')
 
+# Labeled children resolved once rather than looked up on every request
+QUERY_LATENCY = REQUEST_LATENCY.labels(method='POST', endpoint='/query')
+QUERY_RESPONSES = {
+    code: REQUEST_COUNT.labels(method='POST', endpoint='/query', status=code)
+    for code in ('200', '400', '401', '500')
+}
+QUERY_ERRORS = ERROR_COUNT.labels(type='query_error')
+LOGIN_ATTEMPTS = {result: AUTH_ATTEMPTS.labels(result=result) for result in ('success', 'failed')}
+
+# Scrapes are served from a snapshot the lifespan task re-renders periodically,
+# so concurrent scrapers don't each walk every collector
+METRICS_SNAPSHOT_INTERVAL = 2
+metrics_snapshot: Optional[bytes] = None
+
 # Cache for security report
 report_cache = None
 report_lock = asyncio.Lock()
-REPORT_SCHEMA_VERSION = 2
+REPORT_SCHEMA_VERSION = 3
+# Reports are regenerated once older than config.cache_ttl; until the refresh
+# lands the previous one keeps being served, for up to this long
+REPORT_RETENTION_TTL = 7 * 24 * 3600
+# Upper bound on the generating flag, in case a worker dies mid-generation
+REPORT_STATUS_TTL = 600
+
+# The page is static: read it once and serve the same bytes with a content ETag
+INDEX_HTML = (Path(__file__).parent / 'templates' / 'index.html').read_bytes()
+INDEX_ETAG = f'"{hashlib.blake2b(INDEX_HTML, digest_size=16).hexdigest()}"'
 
 # Route handlers
 @app.get("/", response_class=HTMLResponse)
-def index():
+async def index(request: Request):
     """Serve the main application page"""
     logger.info("Chiamata alla route / (index)")
-    with open(Path(__file__).parent / 'templates' / 'index.html', 'r', encoding='utf-8') as f:
-        return f.read()
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or INDEX_ETAG in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers={"ETag": INDEX_ETAG})
+    return HTMLResponse(content=INDEX_HTML, headers={"ETag": INDEX_ETAG})
 
 @app.post("/query")
 @limiter.limit("10/minute")
-async def query(request: Request, current_user: UserSchema = Depends(get_current_active_user), db: Session = Depends(get_db)):
+async def query(request: Request, current_user: DBUser = Depends(get_current_active_user), db: Session = Depends(get_db)):
     """Handle chat queries"""
-    start_time = time.time()
+    started = time.perf_counter()
     try:
         # Get client ID for session management
         client_id = request.client.host if request.client else "unknown"
@@ -319,7 +546,7 @@ async def query(request: Request, current_user: UserSchema = Depends(get_current
 
         if session_id and not session_manager.validate_session(session_id):
             logger.warning(f"Invalid session {session_id} from {client_id}")
-            REQUEST_COUNT.labels(method='POST', endpoint='/query', status='401').inc()
+            QUERY_RESPONSES['401'].inc()
             raise HTTPException(status_code=401, detail="Invalid or expired session")
 
         # Parse and validate input
@@ -329,28 +556,17 @@ async def query(request: Request, current_user: UserSchema = Depends(get_current
 
         # Input validation
         if not input_validator.validate_query(question):
-            REQUEST_COUNT.labels(method='POST', endpoint='/query', status='400').inc()
+            QUERY_RESPONSES['400'].inc()
             logger.warning(f"Invalid query attempt from {client_id}: {question[:100]}")
             raise HTTPException(status_code=400, detail="Invalid query")
 
-        # Get or create conversation
+        # Check the conversation exists; a new one is only written together with
+        # the first exchange, so a failed query doesn't leave an empty one behind
+        conversation = None
         if conversation_id:
-            conversation = db.query(Conversation).filter(
-                Conversation.id == conversation_id,
-                Conversation.user_id == current_user.id
-            ).first()
+            conversation = await run_in_threadpool(get_conversation, db, current_user.id, conversation_id)
             if not conversation:
                 raise HTTPException(status_code=404, detail="Conversation not found")
-        else:
-            # Create new conversation
-            conversation = Conversation(
-                user_id=current_user.id,
-                title=question[:50] + "..." if len(question) > 50 else question
-            )
-            db.add(conversation)
-            db.commit()
-            db.refresh(conversation)
-            CONVERSATION_COUNT.inc()
 
         # Process query
         sanitized_question = input_validator.sanitize_text(question)
@@ -358,29 +574,18 @@ async def query(request: Request, current_user: UserSchema = Depends(get_current
         # Audit log the query
         security_logger.info(f"User {current_user.username} queried: {sanitized_question[:100]}{'...' if len(sanitized_question) > 100 else ''}")
         
-        response = agent.query(sanitized_question)
+        response = await agent.aquery(sanitized_question)
 
         # Save messages to database
-        user_message = Message(
-            conversation_id=conversation.id,
-            role="human",
-            content=sanitized_question
+        title = question[:50] + "..." if len(question) > 50 else question
+        conversation_id, created = await run_in_threadpool(
+            save_exchange, db, current_user.id, conversation, title, sanitized_question, response["answer"]
         )
-        assistant_message = Message(
-            conversation_id=conversation.id,
-            role="assistant",
-            content=response["answer"]
-        )
-
-        db.add(user_message)
-        db.add(assistant_message)
-        db.commit()
+        await cache_manager.incr(get_conversations_version_key(current_user.id))
+        if created:
+            CONVERSATION_COUNT.inc()
         MESSAGE_COUNT.inc(2)  # Increment for both user and assistant messages
 
-        # Update conversation timestamp
-        conversation.updated_at = datetime.now(timezone.utc)
-        db.commit()
-
         # Increment query counter
         QUERY_COUNT.inc()
 
@@ -396,10 +601,10 @@ async def query(request: Request, current_user: UserSchema = Depends(get_current
             session_id = session_manager.create_session(client_id)
 
         # Prepare response
-        json_response = JSONResponse({
+        json_response = ORJSONResponse({
             "answer": input_validator.sanitize_text(response["answer"]),
             "sources": sources,
-            "conversation_id": conversation.id
+            "conversation_id": conversation_id
         })
 
         # Set session cookie
@@ -412,35 +617,45 @@ async def query(request: Request, current_user: UserSchema = Depends(get_current
             max_age=config.session_lifetime
         )
 
-        REQUEST_COUNT.labels(method='POST', endpoint='/query', status='200').inc()
-        REQUEST_LATENCY.labels(method='POST', endpoint='/query').observe(time.time() - start_time)
+        QUERY_RESPONSES['200'].inc()
+        QUERY_LATENCY.observe(time.perf_counter() - started)
 
         return json_response
 
     except HTTPException:
         raise
     except Exception as e:
-        ERROR_COUNT.labels(type='query_error').inc()
-        REQUEST_COUNT.labels(method='POST', endpoint='/query', status='500').inc()
+        QUERY_ERRORS.inc()
+        QUERY_RESPONSES['500'].inc()
         logger.error(f"Error processing query: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @app.get("/report")
-async def report(request: Request, current_user: UserSchema = Depends(get_current_active_user)):
+async def report(request: Request, current_user: DBUser = Depends(get_current_active_user)):
     """Generate and return a security report"""
     try:
-        # Check Redis cache first
-        cache_key = get_report_cache_key()
-        cached_report = cache_manager.get(cache_key)
+        # Check Redis cache first; the report, the generating flag (which another
+        # worker may have set) and the last failure come back in one round trip
+        cached_report, generating, last_error = await cache_manager.get_many(
+            [get_report_cache_key(), get_report_status_cache_key(), get_report_error_cache_key()]
+        )
+        busy = generating or report_lock.locked()
+
+        # Stale-while-revalidate: the last good report is always served, and a
+        # refresh starts once it's past fresh_until (unless one just failed)
         if cached_report:
-            return JSONResponse({"status": "ready", "report": cached_report})
+            if not busy and not last_error and time.time() > cached_report.get("fresh_until", 0):
+                asyncio.create_task(generate_report_background())
+            return ORJSONResponse({"status": "ready", "report": cached_report})
 
         # If not in cache, generate in background
-        if report_lock.locked():
-            return JSONResponse(status_code=202, content={"status": "generating"})
+        if busy:
+            return ORJSONResponse(status_code=202, content={"status": "generating"})
+        if last_error:
+            return ORJSONResponse({"status": "ready", "report": last_error})
 
         asyncio.create_task(generate_report_background())
-        return JSONResponse(status_code=202, content={"status": "started"})
+        return ORJSONResponse(status_code=202, content={"status": "started"})
     except Exception as e:
         logger.error(f"Error generating report: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -450,34 +665,44 @@ async def generate_report_background():
     async with report_lock:
         try:
             logger.info("Starting background report generation...")
+            await cache_manager.set(get_report_status_cache_key(), True, ttl=REPORT_STATUS_TTL)
             loop = asyncio.get_running_loop()
             report = await loop.run_in_executor(None, agent.generate_security_report)
 
-            # Cache in Redis
-            cache_key = get_report_cache_key()
-            cache_data = {"status": "success", "version": REPORT_SCHEMA_VERSION, "data": report}
-            cache_manager.set(cache_key, cache_data, ttl=config.cache_ttl)
+            # Cache in Redis and clear the generating flag in the same transaction
+            cache_data = {
+                "status": "success",
+                "version": REPORT_SCHEMA_VERSION,
+                "data": report,
+                "fresh_until": time.time() + config.cache_ttl
+            }
+            await cache_manager.set_and_delete(
+                get_report_cache_key(), cache_data, ttl=REPORT_RETENTION_TTL,
+                delete_keys=[get_report_status_cache_key(), get_report_error_cache_key()]
+            )
 
             logger.info("Background report generation completed successfully")
         except Exception as e:
             logger.error(f"Background report generation failed: {str(e)}", exc_info=True)
-            # Cache error state
-            cache_key = get_report_cache_key()
+            # Record the failure without touching the last good report; it also
+            # holds off refresh attempts for 5 minutes
             error_data = {"status": "error", "message": str(e)}
-            cache_manager.set(cache_key, error_data, ttl=300)  # Cache errors for 5 minutes
+            await cache_manager.set_and_delete(
+                get_report_error_cache_key(), error_data, ttl=300, delete_keys=[get_report_status_cache_key()]
+            )
 
 @app.get("/conversations")
-async def list_conversations(current_user: UserSchema = Depends(get_current_active_user), db: Session = Depends(get_db)):
+async def list_conversations(current_user: DBUser = Depends(get_current_active_user), db: Session = Depends(get_db)):
     """List conversations for the current user"""
-    convs = db.query(Conversation).filter(Conversation.user_id == current_user.id).order_by(Conversation.updated_at.desc()).all()
-    return {"conversations": [
-        {
-            "id": c.id,
-            "title": c.title,
-            "created_at": c.created_at.isoformat() if c.created_at else None,
-            "updated_at": c.updated_at.isoformat() if c.updated_at else None
-        } for c in convs
-    ]}
+    version = await cache_manager.get_counter(get_conversations_version_key(current_user.id))
+    cache_key = get_conversations_cache_key(current_user.id, version)
+    cached = await cache_manager.get(cache_key)
+    if cached is not None:
+        return cached
+
+    result = {"conversations": await run_in_threadpool(list_user_conversations, db, current_user.id)}
+    await cache_manager.set(cache_key, result, ttl=CONVERSATIONS_CACHE_TTL)
+    return result
 
 @app.get("/health")
 async def health_check():
@@ -498,19 +723,36 @@ async def health_check():
         
         # Avoid slow external checks here; provide a cheap readiness signal only
         
-        return JSONResponse(health_status)
+        return ORJSONResponse(health_status)
     except Exception as e:
         logger.error(f"Health check failed: {str(e)}")
-        return JSONResponse(
+        return ORJSONResponse(
             {"status": "unhealthy", "error": str(e)}, 
             status_code=500
         )
 
-@app.get("/metrics")
-async def metrics(current_user: UserSchema = Depends(get_current_active_user)):
+async def refresh_metrics_snapshot():
+    """Re-render the Prometheus exposition every METRICS_SNAPSHOT_INTERVAL seconds"""
+    global metrics_snapshot
+    while True:
+        try:
+            metrics_snapshot = generate_latest()
+        except Exception as e:
+            logger.error(f"Metrics snapshot failed: {str(e)}", exc_info=True)
+        await asyncio.sleep(METRICS_SNAPSHOT_INTERVAL)
+
+async def authorize_metrics_scrape(request: Request, token: HTTPAuthorizationCredentials = Depends(auth_scheme), db: Session = Depends(get_db)):
+    """Accept the configured METRICS_TOKEN, otherwise require an active user"""
+    if config.metrics_token and hmac.compare_digest(token.credentials.encode(), config.metrics_token.encode()):
+        return
+    await get_current_active_user(await get_current_user(request, token, db))
+
+@app.get("/metrics", dependencies=[Depends(authorize_metrics_scrape)])
+async def metrics():
     """Prometheus metrics endpoint"""
     try:
-        data = generate_latest()
+        # Before the first snapshot (or without the lifespan task) render on demand
+        data = metrics_snapshot if metrics_snapshot is not None else generate_latest()
         return Response(content=data, media_type=CONTENT_TYPE_LATEST)
     except Exception as e:
         logger.error(f"Metrics endpoint failed: {str(e)}", exc_info=True)
@@ -521,18 +763,13 @@ async def register_user(user: UserCreate, db: Session = Depends(get_db)):
     # Optionally disable public registration for single-user mode
     if not getattr(config, 'allow_user_registration', True):
         raise HTTPException(status_code=403, detail="User registration is disabled")
-    # Check if user already exists
-    db_user = get_user(db, user.username)
-    if db_user:
-        raise HTTPException(status_code=400, detail="Username already registered")
-
-    # Check if email already exists
-    email_exists = db.query(DBUser).filter(DBUser.email == user.email).first()
-    if email_exists:
-        raise HTTPException(status_code=400, detail="Email already registered")
+    # Check if username or email already exists
+    conflict = await run_in_threadpool(find_registration_conflict, db, user.username, user.email)
+    if conflict:
+        raise HTTPException(status_code=400, detail=conflict)
 
     # Create new user
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await aget_password_hash(user.password)
     db_user = DBUser(
         username=user.username,
         email=user.email,
@@ -541,9 +778,7 @@ async def register_user(user: UserCreate, db: Session = Depends(get_db)):
     )
 
     try:
-        db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        await run_in_threadpool(save_new_user, db, db_user)
         USER_REGISTRATIONS.inc()
         security_logger.info(f"User registration successful: {user.username}")
         return UserSchema(
@@ -554,16 +789,16 @@ async def register_user(user: UserCreate, db: Session = Depends(get_db)):
             disabled=not db_user.is_active
         )
     except IntegrityError:
-        db.rollback()
+        await run_in_threadpool(db.rollback)
         security_logger.warning(f"User registration failed - duplicate: {user.username}")
         raise HTTPException(status_code=400, detail="Registration failed")
 
 @app.post("/login", response_model=Token)
 async def login_for_access_token(form_data: UserLogin, db: Session = Depends(get_db)):
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         security_logger.warning(f"Failed login attempt for user: {form_data.username}")
-        AUTH_ATTEMPTS.labels(result='failed').inc()
+        LOGIN_ATTEMPTS['failed'].inc()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -574,15 +809,24 @@ async def login_for_access_token(form_data: UserLogin, db: Session = Depends(get
         data={"sub": user.username}, expires_delta=access_token_expires
     )
     security_logger.info(f"User {user.username} logged in successfully")
-    AUTH_ATTEMPTS.labels(result='success').inc()
+    LOGIN_ATTEMPTS['success'].inc()
     return {"access_token": access_token, "token_type": "bearer"}
 
 @app.get("/users/me", response_model=UserSchema)
-async def read_users_me(current_user: UserSchema = Depends(get_current_active_user)):
-    return current_user
+async def read_users_me(current_user: DBUser = Depends(get_current_active_user)):
+    return UserSchema(
+        id=current_user.id,
+        username=current_user.username,
+        email=current_user.email,
+        created_at=current_user.created_at,
+        disabled=not current_user.is_active
+    )
+
+UPLOAD_MAX_SIZE = 1 * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 64 * 1024
 
 @app.post("/upload")
-async def upload_file(file: UploadFile = File(...), current_user: UserSchema = Depends(get_current_active_user)):
+async def upload_file(file: UploadFile = File(...), current_user: DBUser = Depends(get_current_active_user)):
     """Upload and ingest a document into RAG system"""
     try:
         # Validate file type (restrict to safe text formats by default)
@@ -590,68 +834,93 @@ async def upload_file(file: UploadFile = File(...), current_user: UserSchema = D
         if file.content_type not in allowed_types:
             raise HTTPException(status_code=400, detail="Unsupported file type")
         
-        # Enforce size limit (~1MB) to protect memory
-        content = await file.read()
-        max_size = 1 * 1024 * 1024
-        if len(content) > max_size:
-            raise HTTPException(status_code=413, detail="File too large")
-
-        # Decode content safely
+        # Read in chunks, enforcing the size limit (~1MB) and decoding as we go so
+        # oversized or non-UTF-8 uploads are rejected without reading the rest
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        parts = []
+        size = 0
         try:
-            text_content = content.decode('utf-8')
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > UPLOAD_MAX_SIZE:
+                    raise HTTPException(status_code=413, detail="File too large")
+                parts.append(decoder.decode(chunk))
+            parts.append(decoder.decode(b'', final=True))
         except UnicodeDecodeError:
             raise HTTPException(status_code=400, detail="Invalid text encoding; use UTF-8")
-        
-        # Ingest into RAG
-        agent.ingest_documents([text_content])
-        
+        text_content = ''.join(parts)
+
+        # Ingest into RAG; splitting and embedding run off the event loop
+        await run_in_threadpool(agent.ingest_documents, [text_content])
+
         # Audit log the upload
-        security_logger.info(f"User {current_user.username} uploaded file: {file.filename} ({len(content)} bytes)")
+        security_logger.info(f"User {current_user.username} uploaded file: {file.filename} ({size} bytes)")
         
         UPLOAD_COUNT.inc()
         return {"message": f"File {file.filename} ingested successfully"}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error uploading file: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to upload file")
 
 @app.get("/conversations/{conversation_id}/messages")
-async def get_conversation_messages(conversation_id: int, current_user: UserSchema = Depends(get_current_active_user), db: Session = Depends(get_db)):
+async def get_conversation_messages(conversation_id: int, current_user: DBUser = Depends(get_current_active_user), db: Session = Depends(get_db)):
     """Get messages for a specific conversation"""
-    conversation = db.query(Conversation).filter(
-        Conversation.id == conversation_id,
-        Conversation.user_id == current_user.id
-    ).first()
-
-    if not conversation:
+    if not await run_in_threadpool(get_conversation, db, current_user.id, conversation_id):
         raise HTTPException(status_code=404, detail="Conversation not found")
 
-    messages = db.query(Message).filter(Message.conversation_id == conversation_id).order_by(Message.created_at).all()
+    def fetch_first_batch():
+        result = open_conversation_messages(db, conversation_id)
+        return result, result.fetchmany(MESSAGES_STREAM_BATCH)
 
-    return {"messages": [
-        {
-            "id": msg.id,
-            "role": msg.role,
-            "content": msg.content,
-            "created_at": msg.created_at.isoformat()
-        } for msg in messages
-    ]}
+    # The first batch is read before the response starts, so a failing query
+    # still gets a proper error status instead of a truncated 200
+    try:
+        result, rows = await run_in_threadpool(fetch_first_batch)
+    except Exception as e:
+        logger.error(f"Error loading messages: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+    async def stream_messages(rows):
+        # Emits {"messages": [...]} a batch of rows at a time. Uses the request's
+        # db session, which FastAPI (>= 0.118) keeps open until the response ends
+        separator = b""
+        yield b'{"messages":['
+        try:
+            while rows:
+                yield separator + b",".join(
+                    orjson.dumps({"id": msg_id, "role": role, "content": content, "created_at": created_at.isoformat()})
+                    for msg_id, role, content, created_at in rows
+                )
+                separator = b","
+                rows = await run_in_threadpool(result.fetchmany, MESSAGES_STREAM_BATCH)
+        except Exception as e:
+            # Headers are already sent; re-raising aborts the chunked body, so the
+            # client sees a failed transfer instead of a silently truncated list
+            logger.error(f"Error streaming messages of conversation {conversation_id}: {str(e)}", exc_info=True)
+            raise
+        yield b"]}"
+
+    return StreamingResponse(stream_messages(rows), media_type="application/json")
 
 @app.get("/stats")
-async def get_stats(current_user: UserSchema = Depends(get_current_active_user), db: Session = Depends(get_db)):
+async def get_stats(current_user: DBUser = Depends(get_current_active_user), db: Session = Depends(get_db)):
     """Get system statistics"""
     try:
-        # User-specific stats
-        user_conversations = db.query(Conversation).filter(Conversation.user_id == current_user.id).count()
-        user_messages = db.query(Message).join(Conversation).filter(Conversation.user_id == current_user.id).count()
-
         # System-wide stats (admin only)
         configured_admin = getattr(config, 'admin_username', None) or "admin"
         is_admin = current_user.username == configured_admin
+        counts = await run_in_threadpool(count_stats, db, current_user.id, is_admin)
+
+        # User-specific stats
+        user_conversations = counts["user_conversations"]
+        user_messages = counts["user_messages"]
         system_stats = {}
         if is_admin:
-            total_users = db.query(DBUser).count()
-            total_conversations = db.query(Conversation).count()
-            total_messages = db.query(Message).count()
+            total_users = counts["total_users"]
+            total_conversations = counts["total_conversations"]
+            total_messages = counts["total_messages"]
 
             system_stats = {
                 "total_users": total_users,